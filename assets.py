@@ -0,0 +1,386 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+# Remote sources
+FONT_URL = "https://raw.githubusercontent.com/theleagueof/orbitron/master/Orbitron%20Bold.ttf"
+EMBLEM_URL = "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-{tier}.png"
+CHAMPION_ICON_URL = "https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/champion-icons/{champion_id}.png"
+CHAMPION_SUMMARY_URL = "https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/champion-summary.json"
+DDRAGON_VERSION = "14.24.1" # Fallback when the latest patch can't be resolved
+DDRAGON_VERSIONS_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+ITEM_ICON_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/img/item/{item_id}.png"
+ITEM_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/item.json"
+ITEM_SPRITE_URL = "https://ddragon.leagueoflegends.com/cdn/{version}/img/sprite/{sprite}"
+
+# Item atlas: every item icon of a patch as pre-masked tiles in one image
+ITEM_TILE = 48      # DDragon item sprites are 48px tiles, the size used by the item strip
+ITEM_RADIUS = 8     # Rounded corners
+ATLAS_COLUMNS = 32
+
+TIERS = ["IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND", "MASTER", "GRANDMASTER", "CHALLENGER"]
+RANK_EMBLEMS = {tier: EMBLEM_URL.format(tier=tier.lower()) for tier in TIERS}
+
+
+def champion_icon_url(champion_id):
+    return CHAMPION_ICON_URL.format(champion_id=champion_id)
+
+
+def item_icon_url(item_id, version=DDRAGON_VERSION):
+    return ITEM_ICON_URL.format(version=version, item_id=item_id)
+
+
+class AssetStore:
+    """Every remote asset used by the card / embed renderers.
+
+    Lookup order for a URL: bundled copy (committed in the repo) -> disk cache -> download.
+    On top of that, decoded images are kept in an in-memory LRU (keyed by URL + size) and
+    fonts are loaded once per size. With offline=True nothing is ever downloaded.
+
+    Images returned by get_image() are shared: paste them, never draw on them.
+    """
+
+    def __init__(self, cache_dir="assets/cache", bundle_dir="assets/bundle", offline=False, max_images=256, timeout=5, ddragon_version="latest"):
+        self.cache_dir = cache_dir
+        self.bundle_dir = bundle_dir
+        self.offline = offline
+        self.max_images = max_images
+        self.timeout = timeout
+        self.ddragon_version = ddragon_version # "latest" or a pinned patch ("14.24.1")
+        self._resolved_version = None
+        self._item_tiles = {} # version -> {item_id: tile}
+
+        self._images = OrderedDict() # LRU: key -> decoded PIL image
+        self._fonts = {}             # size -> ImageFont
+        self._missing = set()        # URLs that failed this run, not retried
+        self._lock = threading.Lock()
+        self._session = None
+
+    # --- Raw bytes ---
+
+    @staticmethod
+    def _file_name(url):
+        # Stable, filesystem safe name: hash + original extension
+        ext = os.path.splitext(url.split("?")[0])[1] or ".bin"
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20] + ext
+
+    def _download(self, url):
+        if self._session is None:
+            import requests # Only needed on a cache miss
+            self._session = requests.Session()
+        resp = self._session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.content
+
+    def _store(self, folder, name, content, url):
+        try:
+            os.makedirs(folder, exist_ok=True)
+            tmp = os.path.join(folder, name + ".tmp")
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, os.path.join(folder, name))
+        except OSError as e:
+            logging.warning(f"Could not cache asset {url}: {e}")
+
+    def get_bytes(self, url, bundle=False):
+        """Returns the asset content or None.
+
+        bundle=True makes sure the asset ends up in the bundle dir: downloads are stored there and
+        assets only found in the disk cache are copied over.
+        """
+        name = self._file_name(url)
+        for folder in (self.bundle_dir, self.cache_dir):
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    content = f.read()
+                if bundle and folder != self.bundle_dir:
+                    self._store(self.bundle_dir, name, content, url)
+                return content
+
+        if url in self._missing:
+            return None
+        if self.offline:
+            logging.warning(f"Asset missing offline: {url}")
+            self._missing.add(url)
+            return None
+
+        try:
+            content = self._download(url)
+        except Exception as e:
+            logging.error(f"Failed to download asset {url}: {e}")
+            self._missing.add(url)
+            return None
+
+        self._store(self.bundle_dir if bundle else self.cache_dir, name, content, url)
+        return content
+
+    # --- Decoded images / fonts ---
+
+    def get_image(self, url, size=None, crop=False):
+        """Decoded RGBA image (optionally cropped to its visible bbox, then resized), or None."""
+        from PIL import Image
+
+        key = (url, size, crop)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+
+        content = self.get_bytes(url)
+        if not content:
+            return None
+        try:
+            img = Image.open(BytesIO(content)).convert("RGBA")
+        except Exception as e:
+            logging.error(f"Invalid image asset {url}: {e}")
+            return None
+        if crop and img.getbbox():
+            img = img.crop(img.getbbox())
+        if size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+
+        with self._lock:
+            self._images[key] = img
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+        return img
+
+    def get_font(self, size):
+        """Orbitron Bold at `size` (falls back to Arial / PIL default), loaded once per size."""
+        from PIL import ImageFont
+
+        font = self._fonts.get(size)
+        if font:
+            return font
+
+        content = self.get_bytes(FONT_URL)
+        font = None
+        if content:
+            try:
+                font = ImageFont.truetype(BytesIO(content), size)
+            except Exception as e:
+                logging.error(f"Invalid font asset: {e}")
+        if font is None:
+            try: font = ImageFont.truetype("arial.ttf", size)
+            except Exception: font = ImageFont.load_default()
+
+        self._fonts[size] = font
+        return font
+
+    # --- Item atlas ---
+
+    def resolve_ddragon_version(self):
+        """Patch used for item icons: the pinned one, or the latest (resolved once per process).
+
+        Offline, "latest" means the newest atlas already on disk, then DDRAGON_VERSION.
+        """
+        if self._resolved_version:
+            return self._resolved_version
+
+        version = self.ddragon_version
+        if version == "latest":
+            version = None
+            if not self.offline:
+                try:
+                    version = json.loads(self._download(DDRAGON_VERSIONS_URL))[0]
+                except Exception as e:
+                    logging.warning(f"Could not resolve the latest DDragon version: {e}")
+            if not version:
+                on_disk = [name[len("items_"):-len(".json")]
+                           for folder in (self.bundle_dir, self.cache_dir)
+                           if os.path.isdir(os.path.join(folder, "atlas"))
+                           for name in os.listdir(os.path.join(folder, "atlas"))
+                           if name.startswith("items_") and name.endswith(".json")]
+                version = max(on_disk, key=lambda v: [int(x) for x in v.split(".") if x.isdigit()], default=DDRAGON_VERSION)
+
+        self._resolved_version = version
+        return version
+
+    def _atlas_paths(self, folder, version):
+        base = os.path.join(folder, "atlas", f"items_{version}")
+        return base + ".png", base + ".json"
+
+    def _bundle_item_atlas(self, version):
+        """Copies the cached atlas of a patch into the bundle dir. Returns False if there is none to copy."""
+        sources = self._atlas_paths(self.cache_dir, version)
+        targets = self._atlas_paths(self.bundle_dir, version)
+        if all(os.path.exists(path) for path in targets):
+            return True
+        if not all(os.path.exists(path) for path in sources):
+            return False
+        try:
+            os.makedirs(os.path.dirname(targets[0]), exist_ok=True)
+            for source, target in zip(sources, targets):
+                shutil.copyfile(source, target + ".tmp")
+                os.replace(target + ".tmp", target)
+        except OSError as e:
+            logging.warning(f"Could not bundle item atlas {sources[0]}: {e}")
+            return False
+        return True
+
+    def _load_item_atlas(self, version):
+        from PIL import Image
+
+        for folder in (self.bundle_dir, self.cache_dir):
+            png_path, index_path = self._atlas_paths(folder, version)
+            if not (os.path.exists(png_path) and os.path.exists(index_path)):
+                continue
+            try:
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                atlas = Image.open(png_path).convert("RGBA")
+            except Exception as e:
+                logging.error(f"Invalid item atlas {png_path}: {e}")
+                continue
+            tiles = {}
+            for item_id, slot in index.items():
+                x, y = (slot % ATLAS_COLUMNS) * ITEM_TILE, (slot // ATLAS_COLUMNS) * ITEM_TILE
+                tiles[int(item_id)] = atlas.crop((x, y, x + ITEM_TILE, y + ITEM_TILE))
+            return tiles
+        return None
+
+    def _build_item_atlas(self, version, bundle=False):
+        """Cuts every item out of the DDragon sprite sheets (a handful of downloads instead of one
+        per item), applies the rounded mask once and stores the tiles as one atlas image + index."""
+        from PIL import Image, ImageDraw
+
+        content = self.get_bytes(ITEM_DATA_URL.format(version=version), bundle=bundle)
+        if not content:
+            return {}
+        try:
+            items = json.loads(content).get('data', {})
+        except ValueError as e:
+            logging.error(f"Invalid item data for {version}: {e}")
+            return {}
+
+        mask = Image.new("L", (ITEM_TILE, ITEM_TILE), 0)
+        ImageDraw.Draw(mask).rounded_rectangle((0, 0, ITEM_TILE, ITEM_TILE), radius=ITEM_RADIUS, fill=255)
+
+        sheets = {}
+        tiles = {}
+        for item_id, item in items.items():
+            image = item.get('image', {})
+            sprite = image.get('sprite')
+            if sprite not in sheets:
+                sheet = self.get_bytes(ITEM_SPRITE_URL.format(version=version, sprite=sprite), bundle=bundle)
+                try:
+                    sheets[sprite] = Image.open(BytesIO(sheet)).convert("RGBA") if sheet else None
+                except Exception as e:
+                    logging.error(f"Invalid item sprite {sprite}: {e}")
+                    sheets[sprite] = None
+            if sheets[sprite] is None:
+                continue
+
+            x, y, w, h = image['x'], image['y'], image['w'], image['h']
+            icon = sheets[sprite].crop((x, y, x + w, y + h))
+            if icon.size != (ITEM_TILE, ITEM_TILE):
+                icon = icon.resize((ITEM_TILE, ITEM_TILE), Image.Resampling.LANCZOS)
+            tile = Image.new("RGBA", (ITEM_TILE, ITEM_TILE), (0, 0, 0, 0))
+            tile.paste(icon, (0, 0), mask)
+            tiles[int(item_id)] = tile
+
+        if not tiles:
+            return tiles
+
+        # One image + {item_id: slot} index, reloaded by the next runs / worker processes
+        rows = (len(tiles) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+        atlas = Image.new("RGBA", (ATLAS_COLUMNS * ITEM_TILE, rows * ITEM_TILE), (0, 0, 0, 0))
+        index = {}
+        for slot, item_id in enumerate(sorted(tiles)):
+            atlas.paste(tiles[item_id], ((slot % ATLAS_COLUMNS) * ITEM_TILE, (slot // ATLAS_COLUMNS) * ITEM_TILE))
+            index[item_id] = slot
+
+        png_path, index_path = self._atlas_paths(self.bundle_dir if bundle else self.cache_dir, version)
+        try:
+            os.makedirs(os.path.dirname(png_path), exist_ok=True)
+            atlas.save(png_path + ".tmp", format="PNG")
+            os.replace(png_path + ".tmp", png_path)
+            with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(index_path + ".tmp", index_path)
+        except OSError as e:
+            logging.warning(f"Could not store item atlas {png_path}: {e}")
+        logging.info(f"Built item atlas for {version}: {len(tiles)} items")
+        return tiles
+
+    def get_item_tiles(self, version=None, bundle=False):
+        """{item_id: pre-masked ITEM_TILE px RGBA tile} for a patch (default: resolve_ddragon_version()).
+
+        Built once per patch from the sprite sheets, then loaded from the atlas on disk.
+        Tiles are shared: paste them, never draw on them.
+        """
+        version = version or self.resolve_ddragon_version()
+        if bundle and not self._bundle_item_atlas(version):
+            # Nothing cached to copy: build it straight into the bundle
+            tiles = self._build_item_atlas(version, bundle=True)
+            with self._lock:
+                self._item_tiles[version] = tiles
+            return tiles
+        with self._lock:
+            tiles = self._item_tiles.get(version)
+        if tiles is not None:
+            return tiles
+
+        tiles = self._load_item_atlas(version)
+        if tiles is None:
+            tiles = self._build_item_atlas(version, bundle=bundle)
+        with self._lock:
+            self._item_tiles[version] = tiles
+        return tiles
+
+    # --- Warm up ---
+
+    def prefetch(self, champions=True, items=True, version=None, bundle=False):
+        """Downloads every known asset (font, emblems, champion icons, item atlas). Returns the count."""
+        urls = [FONT_URL] + list(RANK_EMBLEMS.values())
+
+        if champions:
+            try:
+                summary = self._download(CHAMPION_SUMMARY_URL)
+                urls += [champion_icon_url(c['id']) for c in json.loads(summary) if c.get('id', -1) > 0]
+            except Exception as e:
+                logging.error(f"Could not list champions: {e}")
+
+        ok = sum(1 for url in urls if self.get_bytes(url, bundle=bundle))
+        if items:
+            ok += len(self.get_item_tiles(version, bundle=bundle))
+        logging.info(f"Prefetched {ok} assets into {self.bundle_dir if bundle else self.cache_dir}")
+        return ok
+
+
+_store = None
+
+def configure(**kwargs):
+    """Creates the process wide AssetStore (call once at startup)."""
+    global _store
+    _store = AssetStore(**kwargs)
+    return _store
+
+def get_store():
+    """Process wide AssetStore shared by every render path."""
+    global _store
+    if _store is None:
+        _store = AssetStore()
+    return _store
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Warm up the render asset cache")
+    parser.add_argument("--prefetch", action="store_true", help="Download font, emblems, champion icons and build the item atlas")
+    parser.add_argument("--bundle", action="store_true", help="Store them in assets/bundle (commit it for fully offline rendering)")
+    parser.add_argument("--no-items", action="store_true", help="Skip the item atlas")
+    parser.add_argument("--version", default=None, help="DDragon patch for the item atlas (default: latest)")
+    args = parser.parse_args()
+
+    if args.prefetch or args.bundle:
+        get_store().prefetch(items=not args.no_items, version=args.version, bundle=args.bundle)
+    else:
+        parser.print_help()
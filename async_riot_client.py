@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from urllib.parse import quote
+
+import aiohttp
+
+import startup
+from rate_limiter import DeadlineExceeded, RateLimiter, time_left
+
+class AsyncRiotClient:
+    """asyncio twin of RiotClient, meant to run directly on the discord.py event loop.
+
+    Same endpoints, same return values (None / [] on error), same rate limiter buckets.
+    Share the RateLimiter instance with the sync client so both count against one budget.
+    """
+
+    MAX_RATE_LIMITED_ATTEMPTS = 3
+    RETRY_STATUSES = (500, 502, 503, 504)
+
+    def __init__(self, api_key, region='euw1', routing_value='europe', pool_size=10, timeout=10, retries=3, rate_limiter=None, match_cache=None):
+        self.api_key = api_key
+        self.region = region
+        self.routing_value = routing_value
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self._sessions = {} # Key: host, Value: aiohttp.ClientSession (created lazily inside the running loop)
+
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.match_cache = match_cache
+
+    def _get_session(self, host):
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"X-Riot-Token": self.api_key},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._sessions[host] = session
+        return session
+
+    async def _sleep(self, delay, deadline):
+        remaining = time_left(deadline)
+        if remaining is not None and delay > remaining:
+            raise DeadlineExceeded(f"Waiting {delay:.1f}s goes past the deadline")
+        await asyncio.sleep(delay)
+
+    async def _get(self, host, method, path, params=None, deadline=None):
+        """Returns (status, json_or_text). Waits on the rate limiter, retries 429 / 5xx.
+
+        With a `deadline` (time.monotonic()) the request timeout is capped to the time left and
+        DeadlineExceeded is raised rather than waiting or retrying past it.
+        """
+        url = f"https://{host}.api.riotgames.com{path}"
+        rate_limited = 0
+        server_errors = 0
+        while True:
+            time_left(deadline) # Don't take a rate limit slot for a request that can't be made anymore
+            wait = self.rate_limiter.reserve(host, method)
+            while wait > 0:
+                await self._sleep(wait, deadline)
+                wait = self.rate_limiter.reserve(host, method)
+
+            startup.mark("first Riot request")
+            remaining = time_left(deadline)
+            timeout = aiohttp.ClientTimeout(total=self.timeout if remaining is None else min(self.timeout, remaining))
+            try:
+                async with self._get_session(host).get(url, params=params, timeout=timeout) as resp:
+                    self.rate_limiter.update(host, method, resp.status, resp.headers)
+                    if resp.status == 200:
+                        return resp.status, await resp.json()
+                    body = await resp.text()
+                    status = resp.status
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+                time_left(deadline) # Timed out because the deadline was close: report it as such
+                if server_errors >= self.retries:
+                    raise
+                server_errors += 1
+                logging.warning(f"Riot API connection error on {method}, retrying: {err}")
+                await self._sleep(0.5 * (2 ** (server_errors - 1)), deadline)
+                continue
+
+            # 429: the limiter already blocked the scope for Retry-After, just queue again
+            if status == 429 and rate_limited < self.MAX_RATE_LIMITED_ATTEMPTS:
+                rate_limited += 1
+                continue
+            if status in self.RETRY_STATUSES and server_errors < self.retries:
+                server_errors += 1
+                await self._sleep(0.5 * (2 ** (server_errors - 1)), deadline)
+                continue
+            return status, body
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions = {}
+
+    async def get_puuid_by_riot_id(self, game_name, tag_line, deadline=None):
+        """Fetches PUUID using Account V1"""
+        try:
+            path = f"/riot/account/v1/accounts/by-riot-id/{quote(game_name)}/{quote(tag_line)}"
+            status, data = await self._get(self.routing_value, "account-v1.by-riot-id", path, deadline=deadline)
+            if status == 200:
+                return data['puuid']
+            logging.error(f"Riot API Error (get_puuid): {status} {data}")
+            return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
+            logging.error(f"Riot API Error (get_puuid): {err}")
+            return None
+
+    async def get_rank_stats(self, puuid, deadline=None):
+        """Fetches League V4 RANKED_SOLO_5x5 entry via PUUID"""
+        try:
+            status, data = await self._get(self.region, "league-v4.entries-by-puuid", f"/lol/league/v4/entries/by-puuid/{puuid}", deadline=deadline)
+            if status == 200:
+                logging.info(f"Rank Data for {puuid}: {data}")
+                for league in data:
+                    if league['queueType'] == 'RANKED_SOLO_5x5':
+                        return league
+                return None # Unranked or not found
+            logging.error(f"Riot API Error (get_rank): {status} {data}")
+            return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
+            logging.error(f"Riot API Error (get_rank): {err}")
+            return None
+
+    async def get_active_game(self, puuid, deadline=None):
+        """Fetches the Spectator V5 game the player is in, None if not in game"""
+        try:
+            status, data = await self._get(self.region, "spectator-v5.active-games", f"/lol/spectator/v5/active-games/by-summoner/{puuid}", deadline=deadline)
+            if status == 200:
+                return data
+            if status != 404: # 404: not in game
+                logging.error(f"Riot API Error (get_active_game): {status} {data}")
+            return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
+            logging.error(f"Riot API Error (get_active_game): {err}")
+            return None
+
+    async def get_last_matches(self, puuid, count=1, start=0, start_time=None, deadline=None):
+        """Fetches list of Ranked Solo/Duo match IDs (Match V5), newest first"""
+        params = {"queue": 420, "count": count, "start": start}
+        if start_time:
+            params["startTime"] = int(start_time)
+        try:
+            status, data = await self._get(self.routing_value, "match-v5.matchlist", f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params, deadline=deadline)
+            if status == 200:
+                return data
+            logging.error(f"Riot API Error (get_matches): {status} {data}")
+            return []
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
+            logging.error(f"Riot API Error (get_matches): {err}")
+            return []
+
+    async def get_match_details(self, match_id, deadline=None):
+        """Fetches Match V5 details (from the match cache when possible)"""
+        # SQLite + zlib + JSON on ~100KB payloads: off the event loop
+        if self.match_cache:
+            cached = await asyncio.to_thread(self.match_cache.get, match_id)
+            if cached:
+                return cached
+        try:
+            status, data = await self._get(self.routing_value, "match-v5.match", f"/lol/match/v5/matches/{match_id}", deadline=deadline)
+            if status == 200:
+                if self.match_cache:
+                    await asyncio.to_thread(self.match_cache.put, match_id, data)
+                return data
+            logging.error(f"Riot API Error (get_match_details): {status} {data}")
+            return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
+            logging.error(f"Riot API Error (get_match_details): {err}")
+            return None
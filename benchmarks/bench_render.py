@@ -0,0 +1,276 @@
+"""Rendering benchmarks, fully offline.
+
+Assets come from fixtures generated into a temp asset store (champion icons, rank emblems,
+item sprite sheet), the match is a trimmed Match-V5 payload from benchmarks/fixtures. The
+card font is the Orbitron file from assets/bundle or assets/cache when it is there (see
+`python assets.py --prefetch`), else --font, else Pillow's default font (much faster, so
+only compare runs made with the same font).
+
+    python benchmarks/bench_render.py                      # run everything
+    python benchmarks/bench_render.py --players 20 -k leaderboard
+    python benchmarks/bench_render.py --save-baseline       # store results as the baseline
+    python benchmarks/bench_render.py --compare             # diff against the baseline
+
+Every benchmark is called once to warm the caches (backgrounds, snake overlays, item atlas),
+then timed. Peak memory is measured on one extra call: "py" is the Python heap (tracemalloc),
+"rss" the growth of the process peak RSS (Linux only), which includes Pillow's image buffers.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+sys.path.insert(0, ROOT)
+
+import assets
+import renderer
+
+FIXTURE_VERSION = "0.0.0-fixture"
+TIERS = ["CHALLENGER", "GRANDMASTER", "MASTER", "DIAMOND", "EMERALD", "PLATINUM", "GOLD", "SILVER", "BRONZE", "IRON"]
+
+
+# --- Fixtures ---
+
+def load_match():
+    with open(os.path.join(FIXTURES, "match_EUW1_7000000001.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fake_players(n):
+    players = []
+    for i in range(n):
+        tier = TIERS[min(i // 2, len(TIERS) - 1)]
+        rank_info = {
+            'tier': tier, 'rank': ["I", "II", "III", "IV"][i % 4], 'leaguePoints': (97 * i) % 100,
+            'wins': 40 + i * 3, 'losses': 35 + (i * 7) % 20,
+        }
+        players.append({'riot_id': f"Fixture{i}#EUW", 'last_rank': rank_info if i % 7 != 6 else None})
+    return players
+
+
+def _png(im):
+    b = BytesIO()
+    im.save(b, format="PNG")
+    return b.getvalue()
+
+
+def build_fixture_assets(folder, match, font=None):
+    """Writes every asset the renderers need into `folder`, under the asset store file names."""
+    from PIL import Image, ImageDraw
+
+    os.makedirs(folder, exist_ok=True)
+
+    def put(url, content):
+        with open(os.path.join(folder, assets.AssetStore._file_name(url)), "wb") as f:
+            f.write(content)
+
+    # Font: real one when available, otherwise the renderers fall back to Pillow's default
+    if font is None:
+        name = assets.AssetStore._file_name(assets.FONT_URL)
+        for candidate in (os.path.join(ROOT, "assets", "bundle", name), os.path.join(ROOT, "assets", "cache", name)):
+            if os.path.exists(candidate):
+                font = candidate
+                break
+    if font:
+        shutil.copy(font, os.path.join(folder, assets.AssetStore._file_name(assets.FONT_URL)))
+
+    # Rank emblems: transparent margins, like the real ones (the renderers crop them)
+    for i, url in enumerate(assets.RANK_EMBLEMS.values()):
+        im = Image.new("RGBA", (640, 360), (0, 0, 0, 0))
+        ImageDraw.Draw(im).ellipse((170, 30, 470, 330), fill=(40 + 20 * i, 120, 220 - 15 * i, 255))
+        put(url, _png(im))
+
+    # Champion icons (120px, like CommunityDragon)
+    for p in match['info']['participants']:
+        cid = p['championId']
+        put(assets.champion_icon_url(cid), _png(Image.new("RGBA", (120, 120), (cid % 255, 90, 160, 255))))
+
+    # Item data + one sprite sheet of 48px tiles, laid out like DDragon's
+    item_ids = sorted({p[f'item{k}'] for p in match['info']['participants'] for k in range(7)} - {0})
+    sheet = Image.new("RGBA", (480, 48 * ((len(item_ids) + 9) // 10)), (0, 0, 0, 0))
+    data = {}
+    for k, item_id in enumerate(item_ids):
+        x, y = (k % 10) * 48, (k // 10) * 48
+        sheet.paste(Image.new("RGBA", (48, 48), (item_id % 255, 180, 60, 255)), (x, y))
+        data[str(item_id)] = {'image': {'sprite': "item0.png", 'x': x, 'y': y, 'w': 48, 'h': 48}}
+    put(assets.ITEM_DATA_URL.format(version=FIXTURE_VERSION), json.dumps({'data': data}).encode("utf-8"))
+    put(assets.ITEM_SPRITE_URL.format(version=FIXTURE_VERSION, sprite="item0.png"), _png(sheet))
+    return bool(font)
+
+
+# --- Measurement ---
+
+def _rss_kb():
+    """(current, peak) RSS in KB, or None outside Linux."""
+    try:
+        values = {}
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(("VmRSS", "VmHWM")):
+                    key, value = line.split(":")
+                    values[key] = int(value.split()[0])
+        return values["VmRSS"], values["VmHWM"]
+    except (OSError, KeyError):
+        return None
+
+
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5") # Resets VmHWM to the current RSS
+        return True
+    except OSError:
+        return False
+
+
+def measure(fn, repeat):
+    fn() # Warm up
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    rss_peak = None
+    if _reset_peak_rss():
+        before = _rss_kb()
+        fn()
+        after = _rss_kb()
+        if before and after:
+            rss_peak = max(0, after[1] - before[0])
+
+    tracemalloc.start()
+    fn()
+    py_peak = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+
+    return {
+        'mean_ms': round(statistics.mean(times), 2),
+        'min_ms': round(min(times), 2),
+        'py_peak_kb': py_peak,
+        'rss_peak_kb': rss_peak,
+    }
+
+
+# --- Benchmarks ---
+
+def build_benchmarks(args, match, bot, loop):
+    players = fake_players(args.players)
+    star = match['info']['participants'][0]
+    rank_info = players[0]['last_rank']
+    item_ids = [star[f'item{k}'] for k in range(7)]
+    animation = {'format': args.format, 'frames': args.frames, 'max_bytes': None}
+
+    def leaderboard_cards():
+        for idx, p in enumerate(players):
+            renderer.render_player_card(p, idx, animation)
+
+    def leaderboard_image():
+        for start in range(0, len(players), renderer.LEADERBOARD_PAGE_SIZE):
+            renderer.render_leaderboard_page(players[start:start + renderer.LEADERBOARD_PAGE_SIZE], start)
+
+    def match_embed():
+        loop.run_until_complete(bot.create_match_embed(players[0], match, star, rank_info, 18, 1))
+
+    return [
+        ("base_card", lambda: renderer.render_base_card(players[4], 4)),
+        ("static_card", lambda: renderer.render_static_card(players[4], 4)),
+        (f"snake_card[{args.format}]", lambda: renderer.render_snake_card(players[0], 0, args.format, args.frames)),
+        ("champion_emblem", lambda: renderer.render_champion_emblem(star['championId'], rank_info['tier'])),
+        ("item_strip", lambda: renderer.render_item_strip(item_ids)),
+        ("match_embed", match_embed),
+        (f"leaderboard_cards[{args.players}]", leaderboard_cards),
+        (f"leaderboard_image[{args.players}]", leaderboard_image),
+    ]
+
+
+def print_results(results, baseline, threshold):
+    regressions = []
+    header = f"{'benchmark':<26}{'mean ms':>10}{'min ms':>10}{'py KB':>9}{'rss KB':>9}"
+    if baseline:
+        header += f"{'base ms':>10}{'delta':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        rss = "-" if r['rss_peak_kb'] is None else r['rss_peak_kb']
+        line = f"{name:<26}{r['mean_ms']:>10}{r['min_ms']:>10}{r['py_peak_kb']:>9}{rss:>9}"
+        base = (baseline or {}).get(name)
+        if base:
+            delta = (r['mean_ms'] - base['mean_ms']) / base['mean_ms'] * 100 if base['mean_ms'] else 0
+            line += f"{base['mean_ms']:>10}{delta:>+8.1f}%"
+            if delta > threshold:
+                regressions.append(name)
+                line += "  <-- slower"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline rendering benchmarks")
+    parser.add_argument("--players", type=int, default=12, help="Players in the full leaderboard runs")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per benchmark")
+    parser.add_argument("--format", default="gif", choices=sorted(renderer.ANIMATION_FORMATS), help="Animated card format")
+    parser.add_argument("--frames", type=int, default=renderer.SNAKE_FRAMES, help="Animated card frame count")
+    parser.add_argument("--font", default=None, help="TTF used as the card font (default: bundled Orbitron if present)")
+    parser.add_argument("-k", dest="only", default=None, help="Only run benchmarks containing this string")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE, default=None, metavar="PATH", help="Save the results as the baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, default=None, metavar="PATH", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Slowdown (%%) reported as a regression by --compare")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+    os.chdir(ROOT) # roasts.json / praises.json for the embed benchmark
+
+    match = load_match()
+    workdir = tempfile.mkdtemp(prefix="bench_render_")
+    try:
+        cache_dir = os.path.join(workdir, "cache")
+        has_font = build_fixture_assets(cache_dir, match, args.font)
+        asset_config = {'cache_dir': cache_dir, 'bundle_dir': os.path.join(workdir, "bundle"), 'offline': True, 'ddragon_version': FIXTURE_VERSION}
+
+        from discord_bot import LeagueDiscordBot
+        bot = LeagueDiscordBot(token="", channel_id=0, tracker=None, config={'assets': asset_config, 'render': {'backend': 'thread'}})
+        loop = asyncio.new_event_loop()
+
+        print(f"Font: {'TrueType' if has_font else 'Pillow default'}, players: {args.players}, repeat: {args.repeat}\n")
+        results = {}
+        for name, fn in build_benchmarks(args, match, bot, loop):
+            if args.only and args.only not in name:
+                continue
+            results[name] = measure(fn, args.repeat)
+
+        baseline = None
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        regressions = print_results(results, baseline, args.threshold)
+
+        if args.save_baseline:
+            with open(args.save_baseline, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"\nBaseline saved to {args.save_baseline}")
+
+        bot.render.close()
+        loop.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
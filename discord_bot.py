@@ -3,21 +3,22 @@ import discord
 from discord.ext import tasks
 import logging
 import asyncio
-import random
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+import assets
+import renderer
+import startup
+from flavor import CORPUS_PATH, FlavorEngine
 
 class LeagueDiscordBot(discord.Client):
-    RANK_EMBLEMS = {
-        "IRON": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-iron.png",
-        "BRONZE": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-bronze.png",
-        "SILVER": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-silver.png",
-        "GOLD": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-gold.png",
-        "PLATINUM": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-platinum.png",
-        "EMERALD": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-emerald.png",
-        "DIAMOND": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-diamond.png",
-        "MASTER": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-master.png",
-        "GRANDMASTER": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-grandmaster.png",
-        "CHALLENGER": "https://raw.communitydragon.org/latest/plugins/rcp-fe-lol-static-assets/global/default/images/ranked-emblem/emblem-challenger.png"
-    }
+    RANK_EMBLEMS = assets.RANK_EMBLEMS
+
+    # Extra wait after the cycle deadline before giving up on a tracker check (its requests stop at the deadline)
+    CYCLE_GRACE = 10
 
     # Removed hardcoded VICTORY/DEFEAT messages as per user request to use only JSON files.
 
@@ -29,28 +30,71 @@ class LeagueDiscordBot(discord.Client):
         self.tracker = tracker
         self.one_shot = one_shot
         self.config = config or {}
-        
-        # Load Roasts
-        try:
-             import json
-             with open('roasts.json', 'r', encoding='utf-8') as f:
-                 self.CHAMPION_ROASTS = json.load(f)
-             logging.info(f"Loaded {len(self.CHAMPION_ROASTS)} champion roasts.")
-        except Exception as e:
-             logging.error(f"Failed to load roasts.json: {e}")
-             self.CHAMPION_ROASTS = {}
-
-        # Load Praises
-        try:
-             with open('praises.json', 'r', encoding='utf-8') as f:
-                 self.CHAMPION_PRAISES = json.load(f)
-             logging.info(f"Loaded {len(self.CHAMPION_PRAISES)} champion praises.")
-        except Exception as e:
-             logging.error(f"Failed to load praises.json: {e}")
-             self.CHAMPION_PRAISES = {}
+        # Fonts / emblems / icons shared by every render path (disk cache + in-memory LRU)
+        asset_conf = self.config.get('assets', {})
+        asset_kwargs = dict(
+            cache_dir=asset_conf.get('cache_dir', 'assets/cache'),
+            bundle_dir=asset_conf.get('bundle_dir', 'assets/bundle'),
+            offline=asset_conf.get('offline', False),
+            ddragon_version=asset_conf.get('ddragon_version', 'latest'),
+        )
+        self.assets = assets.configure(**asset_kwargs)
+
+        # Where card / thumbnail rendering runs: "thread" (default) or "process" (multi core)
+        render_conf = self.config.get('render', {})
+        self.render = renderer.RenderBackend(
+            render_conf.get('backend', 'thread'),
+            workers=render_conf.get('workers'),
+            asset_config=asset_kwargs,
+        )
+        # Top 3 cards: animation format / frame count / upload budget
+        animation_format = render_conf.get('animation_format', 'gif')
+        if animation_format not in renderer.ANIMATION_FORMATS:
+            logging.error(f"Unknown animation_format {animation_format}, using gif")
+            animation_format = 'gif'
+        max_kb = render_conf.get('animation_max_kb')
+        self.animation = {
+            'format': animation_format,
+            'frames': render_conf.get('animation_frames', renderer.SNAKE_FRAMES),
+            'max_bytes': int(max_kb * 1024) if max_kb else None,
+        }
+        # Encoded champion + emblem thumbnails, key: (champion_id, tier). Disk tier in the assets cache
+        self._thumbnails = OrderedDict()
+        self.thumbnail_cache_size = render_conf.get('thumbnail_cache', 128)
+        self.thumbnail_disk = render_conf.get('thumbnail_disk', True)
+
+        # "cards": one (animated for top 3) card per player, "image": whole ranking in one image
+        self.leaderboard_mode = self.config.get('leaderboard_mode', 'cards')
+
+        # Duo/premade games: one combined embed instead of one per tracked player
+        self.group_alerts = self.config.get('group_alerts', False)
+
+        # Tracker check in flight (at most one) and its deadline, in seconds
+        self._cycle = None
+        self.cycle_timeout = self.config.get('cycle_timeout', 60)
+
+        # Seconds between cycles. With adaptive polling a cycle only polls the due players, so it runs more often
+        polling_conf = self.config.get('polling', {})
+        adaptive = getattr(self.tracker, 'scheduler', None) is not None
+        self.poll_interval = polling_conf.get('tick', 30) if adaptive else 120
+        
+        # Roasts / praises: loaded on the first alert (most cycles post none), see the flavor property
+        self._flavor = None
+
+    @property
+    def flavor(self):
+        """Compiled corpus (hot reloaded) or JSON, championId aliases, shuffle bags."""
+        if self._flavor is None:
+            self._flavor = FlavorEngine.from_files(
+                compiled_path=self.config.get('flavor_corpus', CORPUS_PATH),
+                aliases=self.config.get('flavor_aliases'),
+                bags=getattr(self.tracker, 'meta', {}).get('flavor_bags'),
+            )
+        return self._flavor
 
     async def on_ready(self):
         logging.info(f'Logged in as {self.user} (ID: {self.user.id})')
+        startup.mark("Discord ready (gateway)")
         
         # Verify channel visibility
         channel = self.get_channel(self.channel_id)
@@ -62,434 +106,195 @@ class LeagueDiscordBot(discord.Client):
 
         else:
             logging.info(f"Target Channel '{channel.name}' found.")
-            
-            # Initialize Tracker (Sync method running in executor)
-            loop = asyncio.get_event_loop()
-            logging.info('Initializing tracker...')
-            summary = await loop.run_in_executor(None, self.tracker.initialize_players)
-            
-            # Send summary if available (for both one-shot and continuous)
-            if summary:
-                 desc = "✅ **Tracking activé ! Classement actuel :**\n" + "\n".join(summary)
-                 await channel.send(embed=discord.Embed(title="Bot Started", description=desc, color=discord.Color.blue()))
-
-            # Initial Leaderboard Update
-            await self.update_leaderboard()
-
+            await self._start_tracking(channel)
 
         logging.info('Tracker initialized. Starting polling loop.')
         self.loop.create_task(self.polling_loop())
 
+    def _initialize_players(self):
+        # Initialize Tracker (Sync method running in executor)
+        logging.info('Initializing tracker...')
+        return asyncio.get_event_loop().run_in_executor(None, self.tracker.initialize_players)
+
+    async def _start_tracking(self, channel, init=None):
+        # `init`: initialization already started (REST one-shot overlaps it with the login)
+        summary = await (init or self._initialize_players())
+        
+        # Send summary if available (for both one-shot and continuous)
+        if summary:
+             desc = "✅ **Tracking activé ! Classement actuel :**\n" + "\n".join(summary)
+             await channel.send(embed=discord.Embed(title="Bot Started", description=desc, color=discord.Color.blue()))
+
+        # Initial Leaderboard Update
+        await self.update_leaderboard()
+
     async def polling_loop(self):
         await self.wait_until_ready()
         channel = self.get_channel(self.channel_id)
         
         while not self.is_closed():
-            logging.info("Checking for new matches...")
-            try:
-                # Run the check with a strict timeout of 60 seconds (Script runs every 120s locally or once on GH)
-                # On GH, we want it to die fast if stuck.
-                loop = asyncio.get_event_loop()
-                alerts = await asyncio.wait_for(
-                    loop.run_in_executor(None, self.tracker.check_new_matches),
-                    timeout=60.0 # 60 seconds max
-                )
-                
-                if alerts:
-                    for alert in alerts:
-                        # Find participant info for the player
-                        p_data = alert['player']
-                        match = alert['match']
-                        # Find the participant dict for this player's PUUID
-                        participant = next((p for p in match['info']['participants'] if p['puuid'] == p_data['puuid']), None)
-                        
-                        if participant:
-                            embed, files = await self.create_match_embed(p_data, match, participant, alert['rank'], alert['lp_diff'])
-                            if channel:
-                                await channel.send(embed=embed, files=files)
-                            else:
-                                logging.error("Channel not available for sending alert.")
-                    
-                    # Update Leaderboard after a batch of alerts
-                    await self.update_leaderboard()
-            except asyncio.TimeoutError:
-                logging.error("Tracker check timed out! Skipping this cycle.")
-            except Exception as e:
-                logging.error(f"Error in polling loop: {e}")
+            await self._poll_once(channel)
+            startup.report() # Once, after the first cycle (--profile-startup)
             
             if self.one_shot:
                 logging.info("One-shot mode finished. Exiting.")
                 await self.close()
                 break
                 
-            await asyncio.sleep(120) # 2 minutes
-    
-    async def generate_leaderboard_image_async(self, sorted_players):
-        """Generates the leaderboard image in a non-blocking way."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._generate_leaderboard_image_sync, sorted_players)
-
-    async def generate_player_card_async(self, player_data, rank_index):
-        """Generates card (Snake Animation for Top 3, Static for others)."""
-        loop = asyncio.get_event_loop()
-        is_top_3 = rank_index < 3
-        
-        if is_top_3:
-            return await loop.run_in_executor(None, self._generate_snake_animated_card_sync, player_data, rank_index)
-        else:
-            return await loop.run_in_executor(None, self._generate_static_card_sync, player_data, rank_index)
+            await asyncio.sleep(self.poll_interval)
 
-    def _generate_static_card_sync(self, player_data, rank_index):
-        from io import BytesIO
-        import discord
-        
-        im = self._render_base_card(player_data, rank_index)
-        
-        b = BytesIO()
-        im.save(b, format="PNG")
-        b.seek(0)
-        return discord.File(b, filename=f"card_{rank_index}.png")
-
-    def _generate_snake_animated_card_sync(self, player_data, rank_index):
-        from io import BytesIO
-        import discord
-        from PIL import Image, ImageDraw
-        import math
-        
-        # 1. Generate Base Image (Expensive operation, do once)
-        base_im = self._render_base_card(player_data, rank_index)
-        
-        # 2. Setup Snake Path (Chamfered Rect)
-        WIDTH = 1700
-        HEIGHT = 320
-        CUT = 40
-        
-        # Coordinates of the polygon corners
-        path_nodes = [
-            (0, CUT), (CUT, 0),             # Chamfer Top-Left
-            (WIDTH, 0),                     # Top-Right
-            (WIDTH, HEIGHT - CUT),          # Chamfer Bottom-Right Start
-            (WIDTH - CUT, HEIGHT),          # Chamfer Bottom-Right End
-            (0, HEIGHT),                    # Bottom-Left
-            (0, CUT)                        # Loop back to start
-        ]
-        
-        # Calculate total path length and segments
-        total_length = 0
-        segments = []
-        for i in range(len(path_nodes)):
-            p1 = path_nodes[i]
-            p2 = path_nodes[(i + 1) % len(path_nodes)]
-            dist = math.sqrt((p2[0]-p1[0])**2 + (p2[1]-p1[1])**2)
-            segments.append({
-                'start': p1, 'end': p2, 'len': dist, 'cum_start': total_length
-            })
-            total_length += dist
-
-        # Helper: Get X,Y at distance D along path
-        def get_point_at_dist(d):
-            d = d % total_length # Wrap around
-            for seg in segments:
-                if d >= seg['cum_start'] and d <= seg['cum_start'] + seg['len']:
-                    local_d = d - seg['cum_start']
-                    if seg['len'] == 0: return seg['start']
-                    ratio = local_d / seg['len']
-                    x = seg['start'][0] + (seg['end'][0] - seg['start'][0]) * ratio
-                    y = seg['start'][1] + (seg['end'][1] - seg['start'][1]) * ratio
-                    return (x, y)
-            return path_nodes[0]
-
-        # 3. Render Frames
-        frames = []
-        TOTAL_FRAMES = 24 # Smooth loop
-        SNAKE_LEN = 500   # Length of the neon tail
-        
-        # Determine Color
-        NEON_GOLD = (255, 215, 0)
-        NEON_SILVER = (220, 220, 255)
-        NEON_BRONZE = (205, 127, 50)
-        
-        snake_color = NEON_GOLD
-        if rank_index == 1: snake_color = NEON_SILVER
-        elif rank_index == 2: snake_color = NEON_BRONZE
-        
-        for i in range(TOTAL_FRAMES):
-            frame = base_im.copy()
-            draw = ImageDraw.Draw(frame, 'RGBA')
-            
-            # Head position moves forward
-            head_dist = (i / TOTAL_FRAMES) * total_length
-            
-            # Draw Snake segments (Head to Tail)
-            POINTS_COUNT = 25
-            step = SNAKE_LEN / POINTS_COUNT
+    async def _poll_once(self, channel):
+        """One tracker cycle: check every player, post the alerts, refresh the leaderboard."""
+        logging.info("Checking for new matches...")
+        try:
+            alerts = await self._run_check()
+            startup.mark("first cycle checked")
             
-            for j in range(POINTS_COUNT):
-                dist_curr = head_dist - (j * step)
-                dist_prev = head_dist - ((j+1) * step)
-                
-                p1 = get_point_at_dist(dist_curr)
-                p2 = get_point_at_dist(dist_prev)
-                
-                # Alpha fades from 255 (head) to 0 (tail)
-                progress = 1 - (j / POINTS_COUNT)
-                alpha = int(255 * (progress ** 2)) # Quadratic fade for stronger head
-                width = 8 if j < 5 else 5
+            if alerts:
+                await self.send_alerts(channel, alerts)
                 
-                # Draw Glow (Wide low alpha)
-                draw.line([p1, p2], fill=(snake_color[0], snake_color[1], snake_color[2], int(alpha/4)), width=width+8)
-                # Draw Core (Thin high alpha)
-                draw.line([p1, p2], fill=(snake_color[0], snake_color[1], snake_color[2], alpha), width=width)
-
-            # Resize to save space but keep decent quality
-            frame_small = frame.resize((850, 160), Image.Resampling.LANCZOS)
-            frames.append(frame_small)
-            
-        b = BytesIO()
-        frames[0].save(b, format="GIF", save_all=True, append_images=frames[1:], duration=60, loop=0, optimize=True)
-        b.seek(0)
-        return discord.File(b, filename=f"card_{rank_index}.gif")
-
-    def _render_base_card(self, player_data, rank_index):
-        from PIL import Image, ImageDraw, ImageFont, ImageFilter
-        import requests
-        from io import BytesIO
-        import random
-        import discord
-
-        # Configuration (ULTIMATE STATIC)
-        WIDTH = 1700 
-        HEIGHT = 320
-        
-        # Colors
-        BG_DARK = (5, 7, 12)
-        
-        TEXT_WHITE = (255, 255, 255)
-        TEXT_GRAY = (200, 200, 200)
-        
-        # Rank Colors
-        NEON_GOLD = (255, 215, 0)
-        NEON_SILVER = (192, 192, 192) # Slightly darker for contrast
-        NEON_BRONZE = (205, 127, 50)
-        NEON_DEFAULT = (100, 200, 255) # Cyber Blue
-        
-        NEON_GREEN = (0, 255, 100)
-        NEON_RED = (255, 60, 60)
-
-        # Helper to load font
-        def load_font(name, size):
-            import os
-            try:
-                url = "https://raw.githubusercontent.com/theleagueof/orbitron/master/Orbitron%20Bold.ttf"
-                r = requests.get(url, timeout=5)
-                if r.status_code == 200:
-                    return ImageFont.truetype(BytesIO(r.content), size)
-            except: pass
-
-            try: return ImageFont.truetype("arial.ttf", size)
-            except: pass
-            return ImageFont.load_default()
-
-        # Fonts
-        font_rank_big = load_font("Bold", 70) 
-        font_name = load_font("Black", 60)    
-        font_details = load_font("Bold", 35)
-        font_wr = load_font("Bold", 50)       
-        font_wl = load_font("Regular", 28) 
-        font_tiny = load_font("Regular", 15) 
-
-        # Create Canvas
-        im = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(im, 'RGBA')
-
-        # Determine Theme Color
-        theme_color = NEON_DEFAULT
-        if rank_index == 0: theme_color = NEON_GOLD
-        elif rank_index == 1: theme_color = NEON_SILVER
-        elif rank_index == 2: theme_color = NEON_BRONZE
-
-        # --- A. BACKGROUND ---
-        # Dark base
-        draw.polygon([(40,0), (WIDTH,0), (WIDTH, HEIGHT-40), (WIDTH-40, HEIGHT), (0, HEIGHT), (0, 40)], fill=BG_DARK)
-        
-        # Tech Grid (Static Clean)
-        for x in range(0, WIDTH, 50):
-            draw.line([(x, 0), (x, HEIGHT)], fill=(30, 40, 60, 80), width=1)
-        for y in range(0, HEIGHT, 50):
-            draw.line([(0, y), (WIDTH, y)], fill=(30, 40, 60, 80), width=1)
-        
-        # Random Decor (Seeded locally to avoid affecting global random)
-        rng = random.Random(rank_index)
-        for _ in range(8):
-            rx = rng.randint(50, WIDTH-50)
-            ry = rng.randint(50, HEIGHT-50)
-            rw = rng.randint(20, 100)
-            draw.rectangle((rx, ry, rx+rw, ry+2), fill=(theme_color[0], theme_color[1], theme_color[2], 150))
-
-        # --- B. SHAPE & BORDERS ---
-        CUT = 40
-        points = [
-            (CUT, 0), (WIDTH, 0), (WIDTH, HEIGHT - CUT), 
-            (WIDTH - CUT, HEIGHT), (0, HEIGHT), (0, CUT)
-        ]
-        
-        # Glow Border
-        for w in [6, 4, 2]:
-            alpha = 50 + (30 * (6-w))
-            draw.polygon(points, outline=(theme_color[0], theme_color[1], theme_color[2], alpha), width=w)
-
-        # Thick Brackets
-        draw.line([(CUT-5, 0), (CUT+150, 0)], fill=theme_color, width=6)
-        draw.line([(0, CUT-5), (0, CUT+150)], fill=theme_color, width=6)
-        draw.line([(0, CUT), (CUT, 0)], fill=theme_color, width=6)
-
-        draw.line([(WIDTH-CUT+5, HEIGHT), (WIDTH-CUT-150, HEIGHT)], fill=theme_color, width=6)
-        draw.line([(WIDTH, HEIGHT-CUT+5), (WIDTH, HEIGHT-CUT-150)], fill=theme_color, width=6)
-        draw.line([(WIDTH, HEIGHT-CUT), (WIDTH-CUT, HEIGHT)], fill=theme_color, width=6)
-
-        # --- C. RANK SECTION (LEFT) ---
-        # FIX: Dark background for Rank Number, with Colored Outline
-        poly_bg = [(CUT, 0), (220, 0), (260, HEIGHT), (0, HEIGHT), (0, CUT)]
-        draw.polygon(poly_bg, fill=(10, 12, 20, 200)) # Semi-transparent Dark
-        draw.line([(220, 0), (260, HEIGHT)], fill=theme_color, width=2) # Divider Line
-        
-        draw.text((130, HEIGHT//2), f"#{rank_index + 1}", font=font_rank_big, fill=theme_color, anchor="mm")
-        draw.text((130, HEIGHT-40), "RANKING", font=font_tiny, fill=TEXT_GRAY, anchor="mm")
+                # Update Leaderboard after a batch of alerts
+                await self.update_leaderboard()
+        except asyncio.TimeoutError:
+            logging.error("Tracker check still running past its deadline, collected by the next cycle.")
+        except Exception as e:
+            logging.error(f"Error in polling loop: {e}")
+
+    async def _run_check(self):
+        """Runs one tracker check with a deadline (cycle_timeout, script runs every 120s locally or once on GH).
+
+        The deadline goes down to every Riot request, so the check stops on its own and keeps
+        what it already fetched. If it still overruns, it is not cancelled (a worker thread
+        can't be) nor duplicated: the next cycle waits for it and posts its alerts instead of
+        starting another one, so a slow API never gets overlapping checks.
+        """
+        if self._cycle is None:
+            deadline = time.monotonic() + self.cycle_timeout
+            if self.tracker.async_client:
+                # Native asyncio polling, players checked concurrently on the bot loop
+                self._cycle = asyncio.ensure_future(self.tracker.check_new_matches_async(deadline))
+            else:
+                loop = asyncio.get_event_loop()
+                self._cycle = loop.run_in_executor(None, self.tracker.check_new_matches, deadline)
+        else:
+            logging.warning("Previous tracker check overran its deadline, waiting for it instead of starting a new one.")
 
-        # --- D. RANK ICON & HOLOGRAM ---
-        icon_x = 340
-        rank_info = player_data.get('last_rank')
-        
-        # Holographic Floor
-        holo_rect = [icon_x, HEIGHT-60, icon_x+180, HEIGHT-40]
-        draw.ellipse(holo_rect, fill=(theme_color[0], theme_color[1], theme_color[2], 50))
-        draw.ellipse(holo_rect, outline=theme_color, width=2)
-        
-        if rank_info and rank_info['tier'] in self.RANK_EMBLEMS:
+        try:
+            alerts = await asyncio.wait_for(asyncio.shield(self._cycle), timeout=self.cycle_timeout + self.CYCLE_GRACE)
+        except asyncio.TimeoutError:
+            raise # Still running, kept in self._cycle
+        except Exception:
+            self._cycle = None
+            raise
+        self._cycle = None
+        return alerts
+
+    async def run_rest_once(self):
+        """One-shot run over Discord's HTTP API only.
+
+        login() just validates the token over REST: no gateway connection, IDENTIFY or
+        on_ready wait. Channels are fetched over HTTP and the alerts / leaderboard edits
+        go through the same code paths as the gateway mode.
+        """
+        # The Riot side (PUUIDs, ranks) doesn't need Discord: start it before the login round trips
+        init = self._initialize_players()
+        try:
+            await self.login(self.token)
+            startup.mark("Discord login")
             try:
-                url = self.RANK_EMBLEMS[rank_info['tier']]
-                if not hasattr(self, '_icon_cache'): self._icon_cache = {}
-                key = rank_info['tier']
-                if key in self._icon_cache:
-                    icon = self._icon_cache[key]
-                else:
-                    resp = requests.get(url, timeout=3)
-                    icon = Image.open(BytesIO(resp.content)).convert("RGBA")
-                    if icon.getbbox(): icon = icon.crop(icon.getbbox())
-                    icon = icon.resize((210, 210), Image.Resampling.LANCZOS)
-                    self._icon_cache[key] = icon
-                
-                final_x = (icon_x + 90) - (210 // 2)
-                final_y = (HEIGHT - 210) // 2 - 15
-                im.paste(icon, (final_x, final_y), icon)
-            except: pass
+                channel = await self.fetch_channel(self.channel_id)
+            except discord.HTTPException as e:
+                logging.error(f"Channel {self.channel_id} not available: {e}")
+                return
+            startup.mark("channel fetched")
+            logging.info(f"Target Channel '{channel.name}' fetched (REST one-shot).")
+            await self._start_tracking(channel, init)
+            await self._poll_once(channel)
+            logging.info("One-shot mode finished. Exiting.")
+        finally:
+            await asyncio.gather(init, return_exceptions=True) # Login failed: don't close the tracker under it
+            await self.close()
+    
+    def _find_participant(self, alert):
+        # Find the participant dict for this player's PUUID
+        puuid = alert['player']['puuid']
+        return next((p for p in alert['match']['info']['participants'] if p['puuid'] == puuid), None)
+
+    def _group_alerts(self, alerts):
+        """Groups alerts of tracked players that were in the same game on the same team (keeps order)."""
+        groups = {}
+        for alert in alerts:
+            participant = self._find_participant(alert)
+            team = participant['teamId'] if participant else alert['player']['puuid']
+            key = (alert['match']['metadata']['matchId'], team)
+            groups.setdefault(key, []).append(alert)
+        return list(groups.values())
+
+    async def send_alerts(self, channel, alerts):
+        """Posts one embed per alert, or one combined 'group game' embed per premade when group_alerts is on."""
+        if not channel:
+            logging.error("Channel not available for sending alert.")
+            return
 
-        # --- E. INFO & STATS ---
-        name_x = icon_x + 240
-        
-        draw.text((name_x, 60), f"// SUMMONER_ID: {player_data['riot_id']}", font=font_tiny, fill=theme_color, anchor="lm")
-        draw.text((name_x, 110), player_data['riot_id'], font=font_name, fill=TEXT_WHITE, anchor="lm")
-        
-        if rank_info:
-            detail_text = f"{rank_info['tier']} {rank_info['rank']} // {rank_info['leaguePoints']} LP"
+        groups = self._group_alerts(alerts) if self.group_alerts else [[alert] for alert in alerts]
+        for group in groups:
+            if len(group) > 1:
+                embed, files = await self.create_group_match_embed(group)
+            else:
+                alert = group[0]
+                participant = self._find_participant(alert)
+                if not participant:
+                    continue
+                embed, files = await self.create_match_embed(alert['player'], alert['match'], participant, alert['rank'], alert['lp_diff'], lp_games=alert.get('lp_games', 1))
+            await channel.send(embed=embed, files=files)
+
+        # Shuffle bag positions survive restarts / one-shot runs
+        if self._flavor is not None and self._flavor.dirty:
+            self._flavor.dirty = False
+            self.tracker.set_meta('flavor_bags', self._flavor.bags)
+
+    async def close(self):
+        if self._cycle is not None and not self._cycle.done():
+            # Don't flush / close the tracker under a check that is still updating it
+            await asyncio.wait([self._cycle], timeout=self.CYCLE_GRACE)
+            if not self._cycle.done() and self.tracker.async_client:
+                # The async check only touches the state at its very end: cancelling it is safe
+                self._cycle.cancel()
+                await asyncio.gather(self._cycle, return_exceptions=True)
+        if self._cycle is not None and not self._cycle.done():
+            # A worker thread can't be stopped: leave the store as the last saved cycle wrote it
+            logging.error("Tracker check still running at shutdown, state not flushed (its games are checked again next run).")
         else:
-            detail_text = "UNRANKED"
-            
-        # FIX: Darker Glass Panel for readability
-        txt_bbox = draw.textbbox((name_x, 180), detail_text, font=font_details)
-        pill_rect = (name_x - 10, 160, txt_bbox[2] + 20, 200)
-        draw.rounded_rectangle(pill_rect, radius=8, fill=(0, 0, 0, 180), outline=theme_color, width=1)
-        draw.text((name_x, 180), detail_text, font=font_details, fill=theme_color, anchor="lm")
-
-        # --- F. WINRATE HUD ---
-        stats_x = WIDTH - 80
-        if rank_info:
-            wins = rank_info.get('wins', 0)
-            losses = rank_info.get('losses', 0)
-            total = wins + losses
-            wr = (wins / total * 100) if total > 0 else 0
-            
-            draw.text((stats_x, 100), f"{wr:.1f}%", font=font_name, fill=TEXT_WHITE, anchor="rm")
-            draw.text((stats_x, 60), "WINRATE_CALC", font=font_tiny, fill=TEXT_GRAY, anchor="rm")
-            draw.text((stats_x, 150), f"{wins}W / {losses}L", font=font_wl, fill=TEXT_GRAY, anchor="rm")
-            
-            # Segmented Bar
-            bar_w = 350
-            bar_h = 12
-            bar_x = stats_x - bar_w
-            bar_y = 210
-            
-            draw.text((bar_x, bar_y - 20), "PERFORMANCE_METRICS", font=font_tiny, fill=theme_color, anchor="lm")
-            
-            # Background Bar
-            draw.rectangle((bar_x, bar_y, bar_x+bar_w, bar_y+bar_h), fill=(30, 30, 40), outline=None)
-            
-            # Filled Segments
-            color_bar = NEON_GREEN if wr >= 50 else NEON_RED
-            fill_w = int(bar_w * (wr / 100))
-            
-            seg_w = 10
-            gap = 4
-            for i in range(bar_w // (seg_w + gap)):
-                x = bar_x + i * (seg_w + gap)
-                rect = [x, bar_y, x+seg_w, bar_y+bar_h]
-                if x < bar_x + fill_w:
-                    draw.rectangle(rect, fill=color_bar)
+            if self.tracker.async_client:
+                await self.tracker.async_client.close()
+            # Flush + compact the state store, after waiting for the PUUID revalidation: off the event loop
+            await asyncio.get_event_loop().run_in_executor(None, self.tracker.close)
+        self.render.close()
+        await super().close()
 
-        return im
+    async def generate_leaderboard_image_async(self, sorted_players):
+        """Generates the leaderboard image(s) in a non-blocking way. Returns a list of discord.File (one per page)."""
+        size = renderer.LEADERBOARD_PAGE_SIZE
+        starts = range(0, len(sorted_players), size)
+        pages = await asyncio.gather(*(self.generate_leaderboard_page_async(sorted_players, start) for start in starts))
+        return list(pages)
+
+    async def generate_leaderboard_page_async(self, sorted_players, start):
+        """One leaderboard page (players start .. start + LEADERBOARD_PAGE_SIZE) as a discord.File."""
+        rows = sorted_players[start:start + renderer.LEADERBOARD_PAGE_SIZE]
+        data = await self.render.run(renderer.render_leaderboard_page, rows, start)
+        return discord.File(BytesIO(data), filename=f"leaderboard_{start // renderer.LEADERBOARD_PAGE_SIZE}.png")
+
+    async def generate_player_card_async(self, player_data, rank_index):
+        """Generates card (Snake Animation for Top 3, Static for others)."""
+        data = await self.render.run(renderer.render_player_card, player_data, rank_index, self.animation)
+        ext = renderer.animation_extension(self.animation['format']) if rank_index < 3 else "png"
+        return discord.File(BytesIO(data), filename=f"card_{rank_index}.{ext}")
 
     async def generate_item_strip_async(self, item_ids):
         """Generates a horizontal strip of item icons."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._generate_item_strip_sync, item_ids)
-
-    def _generate_item_strip_sync(self, item_ids):
-        from PIL import Image, ImageDraw
-        import requests
-        from io import BytesIO
-
-        # Config
-        ICON_SIZE = 48
-        PADDING = 4
-        TOTAL_ITEMS = 7 # 6 items + 1 trinket
-        WIDTH = (ICON_SIZE * TOTAL_ITEMS) + (PADDING * (TOTAL_ITEMS - 1))
-        HEIGHT = ICON_SIZE
-        
-        # Canvas
-        im = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
-        
-        # Version for DDragon
-        DDRAGON_VER = "14.24.1"
-        
-        for i, item_id in enumerate(item_ids):
-            if item_id == 0: continue # Empty slot
-            
-            try:
-                url = f"https://ddragon.leagueoflegends.com/cdn/{DDRAGON_VER}/img/item/{item_id}.png"
-                resp = requests.get(url, timeout=2)
-                if resp.status_code == 200:
-                    icon = Image.open(BytesIO(resp.content)).convert("RGBA")
-                    icon = icon.resize((ICON_SIZE, ICON_SIZE), Image.Resampling.LANCZOS)
-                    
-                    # Rounded corners for items
-                    mask = Image.new("L", (ICON_SIZE, ICON_SIZE), 0)
-                    draw = ImageDraw.Draw(mask)
-                    draw.rounded_rectangle((0, 0, ICON_SIZE, ICON_SIZE), radius=8, fill=255)
-                    
-                    icon_rounded = Image.new("RGBA", (ICON_SIZE, ICON_SIZE))
-                    icon_rounded.paste(icon, (0, 0), mask)
-                    
-                    # Paste onto strip
-                    x_pos = i * (ICON_SIZE + PADDING)
-                    im.paste(icon_rounded, (x_pos, 0))
-            except Exception as e:
-                pass # Just leave empty if failed
-                
-        b = BytesIO()
-        im.save(b, format="PNG")
-        b.seek(0)
-        import discord
-        return discord.File(b, filename="items.png")
+        data = await self.render.run(renderer.render_item_strip, list(item_ids))
+        return discord.File(BytesIO(data), filename="items.png")
 
     def _analyze_performance(self, p, game_duration):
         """Analyzes player stats and returns a list of tags."""
@@ -576,124 +381,203 @@ class LeagueDiscordBot(discord.Client):
 
         sorted_players = sorted(players_data, key=rank_key, reverse=True)
 
-        # 2. Update Channel
+        # 2. Update Channel (edit only the messages whose content changed)
         try:
-            await channel.purge(limit=20)
-            
-            # Send Header
-            await channel.send("## 🏆 CLASSEMENT SOLO/DUO DU SERVEUR\n*Mis à jour en temps réel*")
-            
-            # Send Card for each player
-            for idx, p in enumerate(sorted_players):
-                file = await self.generate_player_card_async(p, idx)
-                if file:
-                    await channel.send(file=file)
-                else:
-                    logging.error(f"Failed to generate card for {p['riot_id']}")
-
-            logging.info("Leaderboard updated with individual cards.")
-            
+            await self._sync_leaderboard(channel, sorted_players)
         except Exception as e:
-            logging.error(f"Failed to update leaderboard: {e}") 
+            logging.error(f"Failed to update leaderboard: {e}")
+
+    # Diff based leaderboard: header + one message per slot (card or page), edited in place
+    LEADERBOARD_HEADER = "## 🏆 CLASSEMENT SOLO/DUO DU SERVEUR\n*Mis à jour en temps réel*"
+    LEADERBOARD_RENDER_VERSION = 1 # Bump when the card design changes to force a full re-render
+
+    def _card_hash(self, player_data, rank_index):
+        """Hash of everything a card displays (position, riot id, tier, LP, W/L) and its encoding."""
+        rank_info = player_data.get('last_rank') or {}
+        key = [
+            self.LEADERBOARD_RENDER_VERSION, self.animation, rank_index, player_data['riot_id'],
+            rank_info.get('tier'), rank_info.get('rank'), rank_info.get('leaguePoints'),
+            rank_info.get('wins'), rank_info.get('losses'),
+        ]
+        return hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()[:16]
+
+    async def _reset_leaderboard(self, channel, layout):
+        """Deletes the messages of the previous layout and posts a fresh header."""
+        if layout.get('channel') == channel.id:
+            for msg_id in [layout.get('header')] + [slot['id'] for slot in layout.get('slots', [])]:
+                if not msg_id:
+                    continue
+                try:
+                    await channel.get_partial_message(msg_id).delete()
+                except discord.NotFound:
+                    pass
+        elif not layout:
+            # No layout was ever stored (first diff based run): remove our own cards from the old
+            # purge + resend days, once
+            async for message in channel.history(limit=20):
+                if message.author == self.user:
+                    await message.delete()
+
+        header = await channel.send(self.LEADERBOARD_HEADER)
+        layout = {'channel': channel.id, 'mode': self.leaderboard_mode, 'header': header.id, 'slots': []}
+        self.tracker.set_meta('leaderboard', layout)
+        return layout
+
+    async def _sync_leaderboard(self, channel, sorted_players):
+        """Brings the leaderboard messages up to date, rendering only the slots that changed.
+
+        The layout (message ID + content hash per slot) is kept in the tracker state, so a
+        restart or a one-shot run picks up the existing messages instead of reposting them.
+        """
+        card_hashes = [self._card_hash(p, idx) for idx, p in enumerate(sorted_players)]
+        size = renderer.LEADERBOARD_PAGE_SIZE
+        if self.leaderboard_mode == "image":
+            hashes = [
+                hashlib.sha1("".join(card_hashes[i:i + size]).encode('utf-8')).hexdigest()[:16]
+                for i in range(0, len(card_hashes), size)
+            ]
+        else:
+            hashes = card_hashes
 
-            
+        layout = self.tracker.meta.get('leaderboard') or {}
+        if layout.get('channel') != channel.id or layout.get('mode') != self.leaderboard_mode:
+            layout = await self._reset_leaderboard(channel, layout)
+
+        slots = layout['slots']
+        changed = [i for i, h in enumerate(hashes) if i >= len(slots) or slots[i]['hash'] != h]
+        stale = slots[len(hashes):]
+        if not changed and not stale:
+            logging.info("Leaderboard unchanged.")
+            return
+
+        # Render every changed slot up front: with the process backend they run in parallel
+        if self.leaderboard_mode == "image":
+            jobs = [self.generate_leaderboard_page_async(sorted_players, i * size) for i in changed]
+        else:
+            jobs = [self.generate_player_card_async(sorted_players[i], i) for i in changed]
+        files = await asyncio.gather(*jobs, return_exceptions=True)
 
-    
-    async def combine_images_async(self, champion_id, rank_tier):
-        """Downloads Champion Icon and Rank Emblem, stacks them vertically, and returns a discord.File."""
         try:
-            # Run blocking image processing in executor
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(None, self._combine_images_sync, champion_id, rank_tier)
-        except Exception as e:
-            logging.error(f"Failed to combine images: {e}")
-            return None
-
-    def _combine_images_sync(self, champion_id, rank_tier):
-        from PIL import Image, ImageOps, ImageDraw
-        import requests
-        from io import BytesIO
-
-        # Helper to treat images
-        def crop_transparency(img):
-            bbox = img.getbbox()
-            if bbox:
-                return img.crop(bbox)
-            return img
-
-        def add_corners(im, rad):
-            circle = Image.new('L', (rad * 2, rad * 2), 0)
-            draw = ImageDraw.Draw(circle)
-            draw.ellipse((0, 0, rad * 2, rad * 2), fill=255)
-            alpha = Image.new('L', im.size, 255)
-            w, h = im.size
-            alpha.paste(circle.crop((0, 0, rad, rad)), (0, 0))
-            alpha.paste(circle.crop((0, rad, rad, rad * 2)), (0, h - rad))
-            alpha.paste(circle.crop((rad, 0, rad * 2, rad)), (w - rad, 0))
-            alpha.paste(circle.crop((rad, rad, rad * 2, rad * 2)), (w - rad, h - rad))
-            im.putalpha(alpha)
-            return im
-
-        # 1. Download Champion Icon
-        champ_url = f"https://raw.communitydragon.org/latest/plugins/rcp-be-lol-game-data/global/default/v1/champion-icons/{champion_id}.png"
-        resp_champ = requests.get(champ_url)
-        img_champ = Image.open(BytesIO(resp_champ.content)).convert("RGBA")
-        
-        # Resize Champion to a fixed good quality size
-        target_width = 256
-        img_champ = img_champ.resize((target_width, target_width), Image.Resampling.LANCZOS)
-        
-        # Apply Modern Rounded Corners to Champion
-        # Creating a rounded rectangle mask
-        mask = Image.new("L", (target_width, target_width), 0)
-        draw = ImageDraw.Draw(mask)
-        draw.rounded_rectangle((0, 0, target_width, target_width), radius=40, fill=255)
+            for i, file in zip(changed, files):
+                if isinstance(file, Exception):
+                    logging.error(f"Failed to render leaderboard slot #{i + 1}: {file}")
+                    file = None
+
+                if i < len(slots):
+                    if not file:
+                        continue # Keep the old card, retried on the next refresh
+                    try:
+                        await channel.get_partial_message(slots[i]['id']).edit(attachments=[file])
+                    except discord.NotFound:
+                        # Someone deleted one of our messages, the order can't be fixed by editing
+                        logging.warning("Leaderboard message missing, reposting the whole leaderboard.")
+                        layout = await self._reset_leaderboard(channel, layout) # Deletes the rest of our tracked messages
+                        return await self._sync_leaderboard(channel, sorted_players)
+                    slots[i]['hash'] = hashes[i]
+                else:
+                    # New slot at the bottom, a placeholder keeps the order if the render failed
+                    if file:
+                        message = await channel.send(file=file)
+                    else:
+                        message = await channel.send(f"#{i + 1}")
+                    slots.append({'id': message.id, 'hash': hashes[i] if file else None})
+
+            for slot in stale:
+                try:
+                    await channel.get_partial_message(slot['id']).delete()
+                except discord.NotFound:
+                    pass
+            del slots[len(hashes):]
+        finally:
+            self.tracker.set_meta('leaderboard', layout)
+
+        logging.info(f"Leaderboard updated: {len(changed)} message(s) edited/sent, {len(stale)} removed.")
+
+    async def combine_images_async(self, champion_id, rank_tier):
+        """Champion Icon stacked over the Rank Emblem, as a discord.File (None if unavailable)."""
+        key = (champion_id, rank_tier)
+        data = self._thumbnails.get(key)
+        if data:
+            self._thumbnails.move_to_end(key)
+        else:
+            try:
+                data, complete = await self.render.run(renderer.champion_emblem_thumbnail, champion_id, rank_tier, self.thumbnail_disk)
+            except Exception as e:
+                logging.error(f"Failed to combine images: {e}")
+                return None
+            if data is None:
+                return None
+            if complete: # A champion-only fallback is rendered again next time
+                self._thumbnails[key] = data
+                while len(self._thumbnails) > self.thumbnail_cache_size:
+                    self._thumbnails.popitem(last=False)
+        return discord.File(BytesIO(data), filename="combined.png")
+
+    def _pick_flavor_text(self, champion_name, win, champion_id=None):
+        """Praise (win) or roast (loss) line for a champion, no repeats until its lines are exhausted."""
+        return self.flavor.pick(champion_name, win, champion_id)
+
+    def _format_rank_update(self, rank_info, lp_diff, lp_games=1):
+        """'GOLD II - 42 LP' plus the LP diff line when there is one."""
+        tier = rank_info['tier'] if rank_info else "UNRANKED"
+        rank = rank_info['rank'] if rank_info else ""
+        lp = rank_info['leaguePoints'] if rank_info else 0
         
-        # Apply mask
-        img_champ_rounded = Image.new("RGBA", (target_width, target_width))
-        img_champ_rounded.paste(img_champ, (0, 0), mask=mask)
-        img_champ = img_champ_rounded
-
-        # 2. Download Rank Emblem
-        img_rank = None
-        if rank_tier in self.RANK_EMBLEMS:
-            rank_url = self.RANK_EMBLEMS[rank_tier]
-            resp_rank = requests.get(rank_url)
-            img_rank = Image.open(BytesIO(resp_rank.content)).convert("RGBA")
-            
-            # CRITICAL: Crop transparent borders to avoid "tiny image" effect
-            img_rank = crop_transparency(img_rank)
-
-        if not img_rank:
-            # Just return champion image as file
-            b = BytesIO()
-            img_champ.save(b, format="PNG")
-            b.seek(0)
-            return discord.File(b, filename="combined.png")
-
-        # 3. Resize Rank to match Champion Width (maintain aspect ratio)
-        # We want the rank to be the same width as the champion icon (256px)
-        base_width = target_width
-        w_percent = (base_width / float(img_rank.width))
-        h_size = int((float(img_rank.height) * float(w_percent)))
-        img_rank = img_rank.resize((base_width, h_size), Image.Resampling.LANCZOS)
-
-        # 4. Create Composite Image (Vertical Stack with spacing)
-        spacing = 10
-        total_height = img_champ.height + img_rank.height + spacing
-        combined = Image.new("RGBA", (base_width, total_height))
+        rank_str = f"{tier} {rank} - {lp} LP"
         
-        combined.paste(img_champ, (0, 0), img_champ)
-        combined.paste(img_rank, (0, img_champ.height + spacing), img_rank)
+        if lp_diff is not None and lp_diff != 0:
+            emoji = "📈" if lp_diff > 0 else "📉"
+            sign = "+" if lp_diff > 0 else ""
+            lp_diff_str = f"**{sign}{lp_diff} LP** {emoji}"
+            if lp_games > 1:
+                lp_diff_str += f" (sur {lp_games} games)" # Catch-up: diff spans several games
+            rank_display = f"{rank_str}\n{lp_diff_str}"
+        else:
+            rank_display = f"{rank_str}"
 
-        # 5. Save to Bytes
-        output_buffer = BytesIO()
-        combined.save(output_buffer, format="PNG")
-        output_buffer.seek(0)
-        
-        return discord.File(output_buffer, filename="combined.png")
+        return rank_display
+
+    async def create_group_match_embed(self, alerts):
+        """One embed for several tracked players who played the same game on the same team."""
+        match_info = alerts[0]['match']
+        participants = [self._find_participant(alert) for alert in alerts]
+        win = participants[0]['win']
+        game_duration = match_info['info'].get('gameDuration', 0)
 
-    async def create_match_embed(self, player_data, match_info, participant_info, rank_info, lp_diff):
+        color = 0x57F287 if win else 0xED4245
+        outcome = "VICTORY" if win else "DEFEAT"
+        names = ", ".join(alert['player']['riot_id'].split("#")[0] for alert in alerts)
+        title = f"{'🏆' if win else '💀'} GROUP {outcome} • {names}"
+
+        # Flavor for the best (win) or worst (loss) performer of the group
+        def kda(p):
+            return (p['kills'] + p['assists']) / max(1, p['deaths'])
+        star_idx = max(range(len(participants)), key=lambda i: kda(participants[i]) if win else -kda(participants[i]))
+        star = participants[star_idx]
+        flavor_text = self._pick_flavor_text(star['championName'], win, star.get('championId'))
+
+        embed = discord.Embed(title=title, description=f"*{flavor_text}*", color=color)
+        embed.set_author(name="Ranked Solo/Duo • Premade", icon_url="https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png")
+
+        for alert, p in zip(alerts, participants):
+            cs = p['totalMinionsKilled'] + p.get('neutralMinionsKilled', 0)
+            value = f"**{p['kills']}/{p['deaths']}/{p['assists']}** (KDA: {kda(p):.2f}) • **{cs} CS**\n"
+            value += self._format_rank_update(alert['rank'], alert['lp_diff'], alert.get('lp_games', 1))
+            embed.add_field(name=f"{alert['player']['riot_id']} • {p['championName']}", value=value, inline=False)
+
+        # Single thumbnail (star player) instead of one composite per player
+        files = []
+        star_rank = alerts[star_idx]['rank']
+        if star.get('championId'):
+            file_champ = await self.combine_images_async(star['championId'], star_rank['tier'] if star_rank else "UNRANKED")
+            if file_champ:
+                embed.set_thumbnail(url="attachment://combined.png")
+                files.append(file_champ)
+
+        embed.set_footer(text=f"Match Duration: {game_duration // 60}m {game_duration % 60}s")
+        return embed, files
+
+    async def create_match_embed(self, player_data, match_info, participant_info, rank_info, lp_diff, lp_games=1):
         """Creates a modern 'Pro/Esport' style embed for the match result"""
         win = participant_info['win']
         game_duration = match_info['info'].get('gameDuration', 0)
@@ -706,42 +590,7 @@ class LeagueDiscordBot(discord.Client):
         champion_name = participant_info['championName']
         title = f"{'🏆' if win else '💀'} {outcome} as {champion_name}"
 
-        # Flavor Text (Exclusive JSON Logic)
-        flavor_text = outcome # Fallback
-        
-        if win:
-            source_dict = self.CHAMPION_PRAISES
-        else:
-            source_dict = self.CHAMPION_ROASTS
-            
-        if source_dict:
-            # Helper to normalize names (lowercased, only alphanumeric)
-            def normalize(s):
-                return "".join(c.lower() for c in s if c.isalnum())
-            
-            target_norm = normalize(champion_name)
-            found_key = None
-            
-            # 1. Try direct exact match first (Fast)
-            if champion_name in source_dict:
-                found_key = champion_name
-            else:
-                # 2. Search for normalized match (Robust)
-                # This handles Kai'Sa -> kaisa == KaiSa -> kaisa
-                for key in source_dict.keys():
-                    if normalize(key) == target_norm:
-                        found_key = key
-                        break
-            
-            if found_key and source_dict[found_key]:
-                flavor_text = random.choice(source_dict[found_key])
-            else:
-                # Fallback: Pick a random phrase from ANY champion 
-                all_keys = list(source_dict.keys())
-                if all_keys:
-                    random_champ = random.choice(all_keys)
-                    if source_dict[random_champ]:
-                        flavor_text = random.choice(source_dict[random_champ])
+        flavor_text = self._pick_flavor_text(champion_name, win, participant_info.get('championId'))
 
         embed = discord.Embed(title=title, description=f"*{flavor_text}*", color=color)
         
@@ -761,18 +610,7 @@ class LeagueDiscordBot(discord.Client):
 
         # 4. Rank & LP
         tier = rank_info['tier'] if rank_info else "UNRANKED"
-        rank = rank_info['rank'] if rank_info else ""
-        lp = rank_info['leaguePoints'] if rank_info else 0
-        
-        rank_str = f"{tier} {rank} - {lp} LP"
-        
-        if lp_diff is not None and lp_diff != 0:
-            emoji = "📈" if lp_diff > 0 else "📉"
-            sign = "+" if lp_diff > 0 else ""
-            lp_diff_str = f"**{sign}{lp_diff} LP** {emoji}"
-            rank_display = f"{rank_str}\n{lp_diff_str}"
-        else:
-            rank_display = f"{rank_str}"
+        rank_display = self._format_rank_update(rank_info, lp_diff, lp_games)
 
         embed.add_field(name="Rank Update", value=rank_display, inline=True)
         
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import sys
+import time
+
+# championId -> corpus name, for champions whose Riot championName differs from the display name
+CHAMPION_ALIASES = {
+    62: "Wukong",   # championName "MonkeyKing"
+}
+
+
+def normalize(name):
+    """Lowercased, alphanumeric only: Kai'Sa, KaiSa and kaisa all give 'kaisa'."""
+    return "".join(c.lower() for c in name if c.isalnum())
+
+
+# Compiled corpus (built by `python praise_injector.py build`):
+#   header | JSON index {outcome: {key: [first line, count]}} | u32 line offsets | UTF-8 lines
+CORPUS_PATH = "flavor_corpus.bin"
+CORPUS_MAGIC = b"FLVC"
+CORPUS_VERSION = 1
+_HEADER = struct.Struct("<4sHII") # magic, version, index size, line count
+
+
+def _corpus_index(corpus):
+    """{normalized name: tuple of interned lines}, merging names that normalize the same."""
+    index = {}
+    for name, lines in corpus.items():
+        key = normalize(name)
+        index[key] = index.get(key, ()) + tuple(sys.intern(line) for line in lines if isinstance(line, str) and line)
+    return index
+
+
+def source_digest(*paths):
+    """Hash of the JSON sources, stored in the compiled corpus to detect a stale build."""
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def compile_corpus(roasts, praises, path=CORPUS_PATH, source=None):
+    """Writes the compiled corpus atomically. Returns the number of lines."""
+    index = {'source': source}
+    blobs = []
+    offsets = [0]
+    for outcome, corpus in (('win', praises), ('loss', roasts)):
+        index[outcome] = {}
+        for key, lines in sorted(_corpus_index(corpus).items()):
+            index[outcome][key] = [len(blobs), len(lines)]
+            for line in lines:
+                blobs.append(line.encode('utf-8'))
+                offsets.append(offsets[-1] + len(blobs[-1]))
+
+    index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(CORPUS_MAGIC, CORPUS_VERSION, len(index_bytes), len(blobs)))
+        f.write(index_bytes)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(b"".join(blobs))
+    os.replace(tmp, path)
+    return len(blobs)
+
+
+class DictCorpus:
+    """Corpus parsed from the roasts / praises JSON (dict -> tuples of interned strings)."""
+
+    def __init__(self, roasts, praises):
+        self.index = {'win': _corpus_index(praises), 'loss': _corpus_index(roasts)}
+
+    def keys(self, outcome):
+        return tuple(key for key, lines in self.index[outcome].items() if lines)
+
+    def count(self, outcome, key):
+        return len(self.index[outcome].get(key, ()))
+
+    def line(self, outcome, key, i):
+        return self.index[outcome][key][i]
+
+    def close(self):
+        pass
+
+
+class CompiledCorpus:
+    """Compiled corpus: only the small index is parsed, lines are decoded on demand.
+
+    The file is read into memory in one go rather than memory-mapped: Windows refuses to
+    replace a mapped file, which would block `praise_injector.py build` while the bot runs.
+    """
+
+    def __init__(self, path=CORPUS_PATH):
+        with open(path, 'rb') as f:
+            self._data = f.read()
+        magic, version, index_size, n_lines = _HEADER.unpack_from(self._data, 0)
+        if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+            raise ValueError(f"{path} is not a v{CORPUS_VERSION} flavor corpus")
+        self.index = json.loads(self._data[_HEADER.size:_HEADER.size + index_size])
+        self._offsets = _HEADER.size + index_size
+        self._lines = self._offsets + 4 * (n_lines + 1)
+
+    def keys(self, outcome):
+        return tuple(key for key, (_, count) in self.index[outcome].items() if count)
+
+    def count(self, outcome, key):
+        entry = self.index[outcome].get(key)
+        return entry[1] if entry else 0
+
+    def line(self, outcome, key, i):
+        first = self.index[outcome][key][0]
+        start, end = struct.unpack_from("<II", self._data, self._offsets + 4 * (first + i))
+        return self._data[self._lines + start:self._lines + end].decode('utf-8')
+
+    def close(self):
+        self._data = b""
+
+
+def load_corpus(compiled_path=CORPUS_PATH, roasts_path="roasts.json", praises_path="praises.json"):
+    """Compiled corpus when it exists and matches the JSON files, else the JSON files."""
+    if compiled_path and os.path.exists(compiled_path):
+        try:
+            corpus = CompiledCorpus(compiled_path)
+            source = corpus.index.get('source')
+            if source and source != source_digest(roasts_path, praises_path):
+                corpus.close()
+                logging.warning(f"{compiled_path} is older than the JSON files (run praise_injector.py build), using the JSON files.")
+            else:
+                logging.info(f"Loaded compiled flavor corpus {compiled_path}.")
+                return corpus
+        except Exception as e:
+            logging.error(f"Failed to load {compiled_path}, using the JSON files: {e}")
+
+    data = {}
+    for name, path in (('roasts', roasts_path), ('praises', praises_path)):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data[name] = json.load(f)
+            logging.info(f"Loaded {len(data[name])} champion {name}.")
+        except Exception as e:
+            logging.error(f"Failed to load {path}: {e}")
+            data[name] = {}
+    return DictCorpus(data['roasts'], data['praises'])
+
+
+class FlavorEngine:
+    """Praise (win) / roast (loss) lines, indexed once at load time.
+
+    - Lines are looked up by normalized champion name in a DictCorpus (JSON) or a
+      CompiledCorpus, both O(1).
+    - championId aliases cover names that don't normalize to the corpus key (MonkeyKing).
+    - Each (outcome, champion) draws from a shuffle bag: no line repeats before all the
+      others were used. A bag is just [cycle, position] (the order is a seeded shuffle of
+      the cycle), so the state stays tiny and can be persisted with the tracker state.
+    - The corpus files are watched: a rebuilt corpus is picked up without a restart.
+    """
+
+    RELOAD_CHECK_EVERY = 5 # Seconds between mtime checks
+
+    def __init__(self, corpus, aliases=None, bags=None, loader=None, watch=()):
+        self.corpus = corpus
+        self._keys = {outcome: corpus.keys(outcome) for outcome in ('win', 'loss')}
+        self.aliases = {int(cid): normalize(name) for cid, name in {**CHAMPION_ALIASES, **(aliases or {})}.items()}
+        self.bags = dict(bags or {}) # "win:ahri" -> [cycle, position]
+        self.dirty = False
+
+        self._loader = loader
+        self._watch = tuple(watch)
+        self._signature = self._stat()
+        self._checked = time.monotonic()
+
+    @classmethod
+    def from_files(cls, compiled_path=CORPUS_PATH, roasts_path="roasts.json", praises_path="praises.json", **kwargs):
+        loader = lambda: load_corpus(compiled_path, roasts_path, praises_path)
+        return cls(loader(), loader=loader, watch=(compiled_path, roasts_path, praises_path), **kwargs)
+
+    def _stat(self):
+        return tuple(os.stat(path).st_mtime_ns if path and os.path.exists(path) else None for path in self._watch)
+
+    def maybe_reload(self):
+        """Reloads the corpus if one of the watched files changed (checked every few seconds)."""
+        if not self._loader or time.monotonic() - self._checked < self.RELOAD_CHECK_EVERY:
+            return False
+        self._checked = time.monotonic()
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+
+        try:
+            corpus = self._loader()
+        except Exception as e:
+            logging.error(f"Failed to reload the flavor corpus: {e}")
+            return False
+        old, self.corpus = self.corpus, corpus
+        self._keys = {outcome: corpus.keys(outcome) for outcome in ('win', 'loss')}
+        self._signature = signature
+        old.close()
+        logging.info("Flavor corpus reloaded.")
+        return True
+
+    def resolve(self, outcome, champion_name, champion_id=None):
+        """Corpus key for a champion, or None."""
+        key = normalize(champion_name or "")
+        if self.corpus.count(outcome, key):
+            return key
+        alias = self.aliases.get(champion_id) if champion_id is not None else None
+        if alias and self.corpus.count(outcome, alias):
+            return alias
+        return None
+
+    def _draw(self, outcome, key):
+        count = self.corpus.count(outcome, key)
+        bag_key = f"{outcome}:{key}"
+        cycle, position = self.bags.get(bag_key, (0, 0))
+        if position >= count:
+            cycle, position = cycle + 1, 0
+
+        order = list(range(count))
+        random.Random(f"{bag_key}:{cycle}").shuffle(order)
+        self.bags[bag_key] = [cycle, position + 1]
+        self.dirty = True
+        return self.corpus.line(outcome, key, order[position])
+
+    def pick(self, champion_name, win, champion_id=None):
+        """Next line for the champion, a random champion's line if unknown, else VICTORY / DEFEAT."""
+        self.maybe_reload()
+        outcome = 'win' if win else 'loss'
+        key = self.resolve(outcome, champion_name, champion_id)
+        if key:
+            return self._draw(outcome, key)
+
+        # Fallback: Pick a random phrase from ANY champion
+        if self._keys[outcome]:
+            key = random.choice(self._keys[outcome])
+            return self.corpus.line(outcome, key, random.randrange(self.corpus.count(outcome, key)))
+        return "VICTORY" if win else "DEFEAT"
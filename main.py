@@ -1,11 +1,11 @@
+import startup # First: starts the --profile-startup clock
+import argparse
 import json
 import os
 import logging
-from dotenv import load_dotenv
 
-from riot_client import RiotClient
-from tracker import PlayerTracker
-from discord_bot import LeagueDiscordBot
+# Heavy modules (discord.py / aiohttp, requests, the clients) are imported inside main(),
+# after the arguments are parsed, so --profile-startup can time each of them.
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,9 +14,21 @@ def load_config():
     with open('config.json', 'r') as f:
         return json.load(f)
 
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--one-shot", action="store_true", help="Run once and exit (for Cron/GitHub Actions)")
+    parser.add_argument("--profile-startup", action="store_true", help="Log the time of each import / init phase and of the first Riot request")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    if args.profile_startup:
+        startup.enable()
+
     # Load env if present (optional)
-    load_dotenv()
+    with startup.phase("import dotenv + load .env"):
+        from dotenv import load_dotenv
+        load_dotenv()
     
     # Load config
     try:
@@ -61,27 +73,84 @@ def main():
 
     logging.info(f"Credentials loaded. Channel ID: {channel_id_str}")
 
+    with startup.phase("import riot_client (requests)"):
+        from riot_client import RiotClient
+        from rate_limiter import RateLimiter, parse_rate_limit_header
+    with startup.phase("import tracker + state_store"):
+        from tracker import PlayerTracker
+        from state_store import create_state_store
+    with startup.phase("import discord_bot (discord.py, aiohttp)"):
+        from discord_bot import LeagueDiscordBot
+
     # Initialize Components
+    match_cache = None
     try:
-        riot_client = RiotClient(riot_api_key)
-        tracker = PlayerTracker(riot_client, config['players'])
-        
-        # Parse Args
-        import argparse
-        parser = argparse.ArgumentParser()
-        parser.add_argument("--one-shot", action="store_true", help="Run once and exit (for Cron/GitHub Actions)")
-        args = parser.parse_args()
+        http_conf = config.get('riot_http', {})
+        client_kwargs = dict(
+            pool_size=http_conf.get('pool_size', 10),
+            timeout=http_conf.get('timeout', 10),
+            retries=http_conf.get('retries', 3),
+            # One limiter for both clients, they share the same key
+            rate_limiter=RateLimiter(parse_rate_limit_header(http_conf.get('app_rate_limit'))),
+        )
+        cache_conf = config.get('match_cache', {})
+        if cache_conf.get('enabled', True):
+            from match_cache import MatchCache
+            match_cache = client_kwargs['match_cache'] = MatchCache(
+                cache_conf.get('path', 'match_cache.sqlite3'),
+                max_bytes=int(cache_conf.get('max_mb', 200) * 1024 * 1024),
+            )
+        riot_client = RiotClient(riot_api_key, **client_kwargs)
+        async_client = None
+        if http_conf.get('async_polling', True):
+            from async_riot_client import AsyncRiotClient
+            async_client = AsyncRiotClient(riot_api_key, **client_kwargs)
+        polling_conf = config.get('polling', {})
+        scheduler = None
+        if polling_conf.get('adaptive', True):
+            from poll_scheduler import PollScheduler
+            scheduler = PollScheduler(
+                base_interval=polling_conf.get('base_interval', 120),
+                max_interval=polling_conf.get('max_interval', 1800),
+                backoff=polling_conf.get('backoff', 2.0),
+                live_detection=polling_conf.get('live_detection', True),
+                live_interval=polling_conf.get('live_interval', 90),
+                post_game_interval=polling_conf.get('post_game_interval', 60),
+                post_game_polls=polling_conf.get('post_game_polls', 3),
+                requests_per_minute=polling_conf.get('requests_per_minute', 30),
+                path=polling_conf.get('path', 'poll_schedule.json'),
+            )
+        with startup.phase("load tracker state"):
+            tracker = PlayerTracker(
+                riot_client, config['players'],
+                async_client=async_client,
+                max_concurrency=http_conf.get('max_concurrency', 5),
+                puuid_ttl=config.get('puuid_cache_ttl_hours', 168) * 3600,
+                state_store=create_state_store(config.get('state_backend', 'json')),
+                scheduler=scheduler,
+            )
 
         # Initialize Bot
         logging.info("Initializing Discord Bot...")
-        bot = LeagueDiscordBot(token=discord_token, channel_id=int(channel_id_str), tracker=tracker, one_shot=args.one_shot, config=config)
+        with startup.phase("create bot"):
+            bot = LeagueDiscordBot(token=discord_token, channel_id=int(channel_id_str), tracker=tracker, one_shot=args.one_shot, config=config)
         
         # Run Bot
-        logging.info("Starting Bot execution...")
-        bot.run(discord_token)
+        if args.one_shot and config.get('one_shot_transport', 'rest') == 'rest':
+            # Cron runs: REST only, no gateway handshake
+            logging.info("Starting one-shot run (REST)...")
+            import asyncio
+            asyncio.run(bot.run_rest_once())
+        else:
+            logging.info("Starting Bot execution...")
+            bot.run(discord_token)
+        startup.report()
     except Exception as e:
         logging.exception("CRITICAL ERROR DURING EXECUTION:")
         raise e
+    finally:
+        if match_cache:
+            match_cache.close() # Shared by both clients, closed once they are done
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,87 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+
+class MatchCache:
+    """Persistent store for Match-V5 payloads, keyed by match ID.
+
+    A finished match never changes, so once fetched it is served from disk forever
+    (until evicted). Payloads are stored zlib-compressed in SQLite, and the least
+    recently used matches are dropped when the total size goes over `max_bytes`.
+    """
+
+    def __init__(self, path="match_cache.sqlite3", max_bytes=200 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._touched = {} # match_id -> last access, written with the next put() / close() (no commit per read)
+        # Used from executor threads and worker threads of the event loop, the lock serializes access
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS matches ("
+            " match_id TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS matches_lru ON matches(last_access)")
+        self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM matches").fetchone()[0]
+
+    def get(self, match_id):
+        """Returns the cached match dict or None."""
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT data FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+                if not row:
+                    return None
+                self._touched[match_id] = time.time()
+            return json.loads(zlib.decompress(row[0]))
+        except Exception as e:
+            logging.error(f"Match cache read failed for {match_id}: {e}")
+            return None
+
+    def put(self, match_id, match):
+        """Stores a match payload and evicts the LRU entries if over budget."""
+        try:
+            blob = zlib.compress(json.dumps(match, separators=(',', ':')).encode('utf-8'), 6)
+            with self._lock:
+                old = self._db.execute("SELECT size FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO matches (match_id, data, size, last_access) VALUES (?, ?, ?, ?)",
+                    (match_id, blob, len(blob), time.time()),
+                )
+                self._total += len(blob) - (old[0] if old else 0)
+                self._flush_touched()
+                self._evict()
+                self._db.commit()
+        except Exception as e:
+            logging.error(f"Match cache write failed for {match_id}: {e}")
+
+    def _flush_touched(self):
+        # LRU order only: losing these on a crash just makes eviction a little less accurate
+        if self._touched:
+            self._db.executemany("UPDATE matches SET last_access = ? WHERE match_id = ?",
+                                 [(at, match_id) for match_id, at in self._touched.items()])
+            self._touched = {}
+
+    def _evict(self):
+        while self._total > self.max_bytes:
+            row = self._db.execute("SELECT match_id, size FROM matches ORDER BY last_access LIMIT 1").fetchone()
+            if not row:
+                break
+            self._db.execute("DELETE FROM matches WHERE match_id = ?", (row[0],))
+            self._total -= row[1]
+            logging.info(f"Match cache full, evicted {row[0]}")
+
+    def close(self):
+        with self._lock:
+            try:
+                self._flush_touched()
+                self._db.commit()
+            except Exception as e:
+                logging.error(f"Match cache flush failed: {e}")
+            self._db.close()
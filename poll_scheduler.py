@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import time
+
+class PollScheduler:
+    """Per-player poll times instead of polling the whole roster every cycle.
+
+    - Active players (new game found) are polled again after `base_interval`.
+    - Idle players back off exponentially, up to `max_interval`.
+    - Players in a ranked game (Spectator-V5) skip the matchlist: their next check lands
+      when the game can end, then every `live_interval`. Once the game is over the matchlist
+      is polled right away, and retried every `post_game_interval` (Match-V5 lists a game
+      a little after it ends). A player who already queued again still gets those polls:
+      the matchlist is checked on a new live game and while post-game polls are left.
+    - A token bucket caps the polls started per minute; due players past the budget wait for
+      the next cycle, most overdue first.
+
+    Entries are plain dicts, saved to their own JSON file (not the committed tracker state: the
+    poll times change every cycle) so one-shot runs keep them. Saved only when they changed.
+    """
+
+    # Surrender opens at 15 minutes, no ranked game ends much sooner (remakes aside)
+    EARLIEST_GAME_END = 15 * 60
+
+    def __init__(self, base_interval=120, max_interval=1800, backoff=2.0, live_detection=True, live_interval=90,
+                 post_game_interval=60, post_game_polls=3, requests_per_minute=30, path="poll_schedule.json"):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.live_detection = live_detection
+        self.live_interval = live_interval
+        self.post_game_interval = post_game_interval
+        self.post_game_polls = post_game_polls
+
+        # One poll = matchlist (+ spectator when live detection is on); new games cost more but are rare
+        self.poll_cost = 2 if live_detection else 1
+        self.requests_per_minute = requests_per_minute
+        self._tokens = float(requests_per_minute)
+        self._refilled = time.monotonic()
+
+        self.entries = {} # Key: PUUID, Value: {'next': epoch s, 'idle': empty polls in a row, 'live': game start ms, 'game': live gameId, 'post': polls left}
+        self.path = path
+        self._saved = None # Last written content, to skip unchanged saves
+        self.load()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._saved = f.read()
+            self.entries = json.loads(self._saved)
+        except Exception as e:
+            logging.error(f"Failed to load poll schedule {self.path}, everyone is due: {e}")
+            self.entries = {}
+
+    def save(self, puuids):
+        """Writes the entries of the tracked players (drops removed ones) if they changed."""
+        if not self.path:
+            return
+        content = json.dumps({puuid: entry for puuid, entry in self.entries.items() if puuid in puuids}, sort_keys=True)
+        if content == self._saved:
+            return
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp, self.path)
+            self._saved = content
+        except OSError as e:
+            logging.error(f"Failed to save poll schedule {self.path}: {e}")
+
+    def _entry(self, puuid):
+        return self.entries.setdefault(puuid, {'next': 0, 'idle': 0, 'live': None, 'game': None, 'post': 0})
+
+    def interval(self, idle):
+        """Delay after `idle` empty polls in a row: base, 2x base, 4x base... up to max_interval."""
+        return min(self.max_interval, self.base_interval * self.backoff ** max(0, idle - 1))
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.requests_per_minute, self._tokens + (now - self._refilled) * self.requests_per_minute / 60)
+        self._refilled = now
+
+    def due(self, puuids, now=None):
+        """PUUIDs to poll now, most overdue first, within the request budget."""
+        now = time.time() if now is None else now
+        due = sorted((self._entry(puuid)['next'], puuid) for puuid in puuids if self._entry(puuid)['next'] <= now)
+        self._refill()
+        picked = []
+        for _, puuid in due:
+            if self._tokens < self.poll_cost:
+                logging.info(f"Request budget used up, {len(due) - len(picked)} due player(s) wait for the next cycle.")
+                break
+            self._tokens -= self.poll_cost
+            picked.append(puuid)
+        return picked
+
+    def needs_matchlist(self, puuid, game):
+        """Whether a player seen in game (Spectator-V5 payload) must have the matchlist polled anyway:
+        the game is new (the previous one may just have ended) or post-game polls are left."""
+        entry = self._entry(puuid)
+        return entry['post'] > 0 or entry.get('game') != game.get('gameId')
+
+    def record_live(self, puuid, game, polled=False, found=False, now=None):
+        """The player is in a ranked game (Spectator-V5 payload): check again when it can be over.
+
+        `polled` / `found`: the matchlist was checked as well (see needs_matchlist) / had new games.
+        """
+        now = time.time() if now is None else now
+        entry = self._entry(puuid)
+        same_game = entry.get('game') == game.get('gameId')
+        if entry.get('live') and not same_game:
+            # Straight from one game into the next: the previous one just ended
+            entry['post'] = self.post_game_polls
+        if polled:
+            entry['post'] = 0 if found else max(0, entry['post'] - 1)
+
+        start = game.get('gameStartTime') or (entry.get('live') if same_game else None) or now * 1000 # 0 during the loading screen
+        entry['live'] = start
+        entry['game'] = game.get('gameId')
+        entry['idle'] = 0
+        if entry['post'] > 0:
+            entry['next'] = now + self.post_game_interval # The previous game isn't listed yet
+        else:
+            entry['next'] = max(now + self.live_interval, start / 1000 + self.EARLIEST_GAME_END)
+
+    def record_poll(self, puuid, found, now=None):
+        """The matchlist was polled, `found`: new games came out of it."""
+        now = time.time() if now is None else now
+        entry = self._entry(puuid)
+        if entry.get('live'):
+            # Was in game at the previous check and isn't anymore: the game just ended
+            entry['live'] = None
+            entry['post'] = self.post_game_polls
+        if found:
+            entry['idle'] = 0
+            entry['post'] = 0
+            entry['next'] = now + self.base_interval
+        elif entry['post'] > 0:
+            entry['post'] -= 1
+            entry['next'] = now + self.post_game_interval
+        else:
+            entry['idle'] += 1
+            entry['next'] = now + self.interval(entry['idle'])
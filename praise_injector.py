@@ -1,284 +1,181 @@
+"""Flavor corpus tool: validates, dedupes, merges and compiles roasts.json / praises.json.
+
+    python praise_injector.py validate
+    python praise_injector.py dedupe
+    python praise_injector.py merge praises new_praises.json    # {"Champion": ["line", ...]}
+    python praise_injector.py build
+
+merge / dedupe rewrite the JSON and rebuild the compiled corpus (flavor_corpus.bin), which the
+bot loads and hot-reloads. The JSON files stay the source of truth.
+"""
+import argparse
 import json
+import logging
 import os
+import sys
+
+from flavor import CORPUS_PATH, compile_corpus, normalize, source_digest
+
+CORPUS_FILES = {'roasts': 'roasts.json', 'praises': 'praises.json'}
+MAX_LINE_LENGTH = 300 # Embed description, keep it a one-liner
+
+
+def load(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _line_key(line):
+    # Same line modulo case / spacing
+    return " ".join(line.split()).casefold()
+
+
+def validate(data, name="corpus"):
+    """Returns (errors, warnings) as lists of messages."""
+    errors, warnings = [], []
+    if not isinstance(data, dict):
+        return [f"{name}: top level must be an object"], warnings
+
+    seen_names = {}
+    for champion, lines in data.items():
+        key = normalize(champion)
+        if not key:
+            errors.append(f"{name}: invalid champion name {champion!r}")
+        elif key in seen_names:
+            warnings.append(f"{name}: {champion!r} and {seen_names[key]!r} are the same champion")
+        seen_names[key] = champion
+
+        if not isinstance(lines, list):
+            errors.append(f"{name}/{champion}: lines must be a list")
+            continue
+        seen_lines = set()
+        for line in lines:
+            if not isinstance(line, str) or not line.strip():
+                errors.append(f"{name}/{champion}: empty or non-text line {line!r}")
+                continue
+            if "\n" in line:
+                errors.append(f"{name}/{champion}: line contains a newline: {line!r}")
+            if len(line) > MAX_LINE_LENGTH:
+                errors.append(f"{name}/{champion}: line over {MAX_LINE_LENGTH} chars: {line[:40]!r}...")
+            if _line_key(line) in seen_lines:
+                warnings.append(f"{name}/{champion}: duplicate line {line!r}")
+            seen_lines.add(_line_key(line))
+        if not lines:
+            warnings.append(f"{name}/{champion}: no lines")
+    return errors, warnings
+
+
+def dedupe(data):
+    """Strips lines, drops duplicates (per champion) and merges same-champion keys. Returns the removed count."""
+    removed = 0
+    result = {}
+    key_names = {}
+    for champion, lines in data.items():
+        target = key_names.setdefault(normalize(champion), champion)
+        bucket = result.setdefault(target, [])
+        seen = {_line_key(line) for line in bucket}
+        for line in lines:
+            line = line.strip()
+            if _line_key(line) in seen:
+                removed += 1
+                continue
+            seen.add(_line_key(line))
+            bucket.append(line)
+    data.clear()
+    data.update(result)
+    return removed
+
+
+def merge(data, new):
+    """Adds the new lines (deduped) under the existing spelling of each champion. Returns the added count."""
+    key_names = {normalize(champion): champion for champion in data}
+    added = 0
+    for champion, lines in new.items():
+        target = key_names.setdefault(normalize(champion), champion)
+        bucket = data.setdefault(target, [])
+        seen = {_line_key(line) for line in bucket}
+        for line in lines:
+            line = line.strip()
+            if line and _line_key(line) not in seen:
+                seen.add(_line_key(line))
+                bucket.append(line)
+                added += 1
+    return added
+
+
+def check_all():
+    ok = True
+    for name, path in CORPUS_FILES.items():
+        errors, warnings = validate(load(path), name)
+        for message in warnings:
+            logging.warning(message)
+        for message in errors:
+            logging.error(message)
+        ok = ok and not errors
+    return ok
+
+
+def build(output=CORPUS_PATH):
+    if not check_all():
+        logging.error("Corpus has errors, not compiled.")
+        return False
+    roasts, praises = CORPUS_FILES['roasts'], CORPUS_FILES['praises']
+    count = compile_corpus(load(roasts), load(praises), output, source=source_digest(roasts, praises))
+    logging.info(f"Compiled {count} lines into {output} ({os.path.getsize(output)} bytes)")
+    return True
 
-filepath = r'c:\Users\migue\Desktop\Bureau\DiscordLol\praises.json'
 
-new_praises = {
-    "Vex": [
-        "Pff... victoire. Si tu veux.",
-        "Ombre a fait tout le boulot.",
-        "Tu as, reset l'ulti sur toute l'équipe.",
-        "La déprime gagne toujours.",
-        "Yordle gothique.",
-        "Tu as fear tout le monde.",
-        "Trop d'efforts... mais ça valait le coup.",
-        "L'anti-dash ultime.",
-        "Le monde est sombre, comme leur écran.",
-        "Misère et victoire."
-    ],
-    "Vi": [
-        "Vi, pour Violence !",
-        "Tu as punché ton ticket pour la victoire.",
-        "Gantelets Hextech chargés.",
-        "L'ulti inarrêtable sur le carry.",
-        "Piltover Enforcer.",
-        "Tu as brisé leurs armures.",
-        "Coup de poing dévastateur.",
-        "J'aime quand ça craque.",
-        "La loi, c'est mes poings.",
-        "Tu as impacté la game."
-    ],
-    "Viego": [
-        "Le Roi Déchu règne.",
-        "Tu as possédé leurs âmes et leurs kits.",
-        "Un champion ? Non, TOUS les champions.",
-        "Le cœur brisé, mais le score entier.",
-        "Brume noire envahissante.",
-        "Lame du Roi Déchu.",
-        "Reset en chaîne.",
-        "Isolde serait fière.",
-        "Tu as pris leur vie, tu as pris leur corps.",
-        "Souverain."
-    ],
-    "Viktor": [
-        "L'Évolution Glorieuse !",
-        "Tu as upgrade tes sorts, tu as upgrade la win.",
-        "Rayon de la mort : nettoyé.",
-        "Chaos Storm parfaite.",
-        "Héraut des machines.",
-        "Zaun triomphe par la science.",
-        "Gravité contrôlée.",
-        "Le métal est plus fort que la chair.",
-        "Tu as calculé chaque mouvement.",
-        "Progrès inarrêtable."
-    ],
-    "Vladimir": [
-        "La rivière sera rouge.",
-        "Hémomancien suprême.",
-        "Tu as pool leur ulti : génie.",
-        "Sustain infini.",
-        "Le sang coule à flots.",
-        "Late game monster.",
-        "Tu as one-shot l'équipe avec E-R.",
-        "Seigneur vampire.",
-        "Dîner servi.",
-        "Vitalité volée."
-    ],
-    "Volibear": [
-        "LA TEMPÊTE APPROCHE !",
-        "Le Dieu Ours a écrasé l'idole.",
-        "Tu as désactivé la tour, tu as tué le laner.",
-        "Foudre et griffes.",
-        "Valhir !",
-        "Tu as tanké la foudre.",
-        "Sauvagerie incarne.",
-        "L'orage gronde pour la victoire.",
-        "Tu as mordu la poussière... euh non, eux.",
-        "Puissance primordiale."
-    ],
-    "Warwick": [
-        "L'odeur du sang...",
-        "Tu as traversé la map en sprint.",
-        "Loup de Zaun.",
-        "Suppression infinie.",
-        "Tu refuses de mourir.",
-        "Huuuuuuuurl !",
-        "La chasse ne s'arrête jamais.",
-        "Griffes acérées.",
-        "Tu as flairé la victoire.",
-        "Bête déchaînée."
-    ],
-    "Wukong": [
-        "Wuju ? Non, Wukong !",
-        "Le Roi des Singes a trompé tout le monde.",
-        "Clone juke : magnifique.",
-        "Le bâton s'allonge, la victoire approche.",
-        "Cyclone double knockup.",
-        "Tu as spin to win.",
-        "Agile et puissant.",
-        "Vastaya malicieux.",
-        "Tu as atteint le sommet.",
-        "La voie du guerrier."
-    ],
-    "Xayah": [
-        "Les plumes ont volé.",
-        "Rappel de plumes : Pentakill.",
-        "Rebelle Vastaya.",
-        "Intouchable avec l'ulti.",
-        "Rakan t'a aidée, mais tu as carry.",
-        "Danseuse de lames (plumes).",
-        "Tu as, percé leurs lignes.",
-        "Liberté !",
-        "Grâce mortelle.",
-        "Plumage d'or."
-    ],
-    "Xerath": [
-        "La forme pure de la magie.",
-        "Arcanopulse sniper.",
-        "Rite Arcanique : Bombardement.",
-        "Tu as touché tous les skillshots.",
-        "Ascension ratée ? Non, victoire réussie.",
-        "Puissance illimitée.",
-        "Tu as foudroyé l'équipe.",
-        "Mage d'artillerie.",
-        "Sarcophage brisé.",
-        "Énergie brute."
-    ],
-    "XinZhao": [
-        "Pour le Roi !",
-        "Sénéchal de Demacia.",
-        "Tu as foncé dans la mêlée.",
-        "Ulti : Zone VIP, vous ne rentrez pas.",
-        "Trois coups, un knockup, un mort.",
-        "Lancier expert.",
-        "Le destin est au bout de ta lance.",
-        "Courage sans faille.",
-        "Tu as défendu l'honneur.",
-        "Guerrier modèle."
-    ],
-    "Yasuo": [
-        "HASAGI !",
-        "Sorye Ge Ton !",
-        "Mur de vent : 0 dégâts subis.",
-        "Tu as atteint le powerspike 0/10 (non je rigole, tu as carry).",
-        "Disgracié ? Non, glorifié.",
-        "La voie du vagabond.",
-        "Tornade touchée, ulti activé.",
-        "Dernier Souffle.",
-        "Lame du vent.",
-        "Face the wind."
-    ],
-    "Yone": [
-        "Un coupé, un scellé.",
-        "Le frère est revenu.",
-        "Spirit form outplay.",
-        "Ulti Fate Sealed sur 5 personnes.",
-        "Double épée, double style.",
-        "Azakana chassé.",
-        "Tu as transcendé la mort.",
-        "Assassinat propre.",
-        "Vent et Acier.",
-        "La voie du chasseur."
-    ],
-    "Yorick": [
-        "La Dame a fait le travail.",
-        "Tu as, push jusqu'à l'inhibiteur.",
-        "Les goules ont mangé la tour.",
-        "Berger des âmes perdues.",
-        "Pelle MVP.",
-        "Tu as enfermé l'ennemi dans le mur.",
-        "Défouisseur victorieux.",
-        "L'Île Obscure marche avec toi.",
-        "Splitpush inarrêtable.",
-        "La fin est inévitable."
-    ],
-    "Yuumi": [
-        "Tu es le chat ! 😺",
-        "Livre magique ouvert, victoire ouverte.",
-        "Tu as zoomies partout.",
-        "Chapitre final : Win.",
-        "Le parasite préféré.",
-        "Tu as, gardé ton carry en vie.",
-        "Miaou !",
-        "Chatte magique.",
-        "Intouchable (littéralement).",
-        "Nous avons gagné ! (Surtout toi)."
-    ],
-    "Zac": [
-        "Je suis fait pour ça... littéralement.",
-        "Rebondissement !",
-        "Slingshot depuis le fog of war.",
-        "L'arme secrète a fonctionné.",
-        "Tu as englué l'ennemi.",
-        "Pas de costume pour gagner.",
-        "Regroupement familial (de blobs).",
-        "Tu as tanké et CC.",
-        "Flubber de combat.",
-        "Élastique et fantastique."
-    ],
-    "Zed": [
-        "L'ombre tue...",
-        "Look at the cleanse, look at the moves ! FAKER !",
-        "Death Mark : Pop.",
-        "Ninja des ombres.",
-        "Tu as disparu, ils sont morts.",
-        "Maître de l'Ordre.",
-        "Shuriken croisé.",
-        "L'équilibre est un mensonge, la victoire est vraie.",
-        "Intouchable.",
-        "Tu es l'ombre qui gagne."
-    ],
-    "Zeri": [
-        "Je suis survoltée !",
-        "Vitesse, vitesse, vitesse !",
-        "Tu as kité à la vitesse de l'éclair.",
-        "Zaunite rapide.",
-        "Wall ride pour le flank.",
-        "Mitraillette électrique.",
-        "Tu as, zappé la concurrence.",
-        "Étincelle de vie.",
-        "Tu ne t'arrêtes jamais.",
-        "Batterie pleine."
-    ],
-    "Ziggs": [
-        "Ça va péter !",
-        "BOMBE INTÉGRALE !",
-        "Tu as démoli les tours.",
-        "Yordle explosif.",
-        "Zone minée.",
-        "Tu as satchel charge pour t'enfuir (ou tuer).",
-        "Expert en Hexplosifs.",
-        "Mèche courte.",
-        "Feu d'artifice de victoire.",
-        "Boum."
-    ],
-    "Zilean": [
-        "Je savais que tu ferais ça.",
-        "Retour vers le passé (pour revivre).",
-        "Tu as sauvé le carry de la mort.",
-        "Double bombe stunlock.",
-        "Gardien du Temps.",
-        "Tu as contrôlé l'horloge.",
-        "Vitesse grand V.",
-        "Expérience partagée.",
-        "Le temps est de ton côté.",
-        "Vieil horloger victorieux."
-    ],
-    "Zoe": [
-        "Coucou !",
-        "Bulle dodo... et BOUM.",
-        "Tu as volé leurs summoners.",
-        "Aspect du Crépuscule.",
-        "Paddle Star sniper.",
-        "Tu as trollé l'ennemi avec le sourire.",
-        "Espace-temps plié.",
-        "Petite fille cosmique.",
-        "Portail jump outplay.",
-        "Chocolat et victoire."
-    ],
-    "Zyra": [
-        "La nature est cruelle... et toi aussi.",
-        "Jardin mortel.",
-        "Les plantes ont fait le travail.",
-        "Stranglethorns !",
-        "Épines fatales.",
-        "Reine des Ronces.",
-        "Tu as, enraciné l'équipe adverse.",
-        "Tout pousse, tout meurt.",
-        "Floraison de la victoire.",
-        "Dame Nature en colère."
-    ]
-}
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Flavor corpus tool (roasts / praises)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("validate", help="Check both corpus files")
+    sub.add_parser("dedupe", help="Remove duplicate lines, then rebuild")
+    merge_parser = sub.add_parser("merge", help="Merge new lines from a JSON file, then rebuild")
+    merge_parser.add_argument("corpus", choices=sorted(CORPUS_FILES))
+    merge_parser.add_argument("source", help='JSON file: {"Champion": ["line", ...]}')
+    build_parser = sub.add_parser("build", help="Compile the corpus for the bot")
+    build_parser.add_argument("--output", default=CORPUS_PATH)
+    args = parser.parse_args()
 
-if os.path.exists(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-else:
-    data = {}
+    if args.command == "validate":
+        ok = check_all()
+        logging.info("Corpus OK." if ok else "Corpus has errors.")
+    elif args.command == "dedupe":
+        for name, path in CORPUS_FILES.items():
+            data = load(path)
+            removed = dedupe(data)
+            if removed:
+                save(path, data)
+            logging.info(f"{name}: removed {removed} duplicate lines.")
+        ok = build()
+    elif args.command == "merge":
+        path = CORPUS_FILES[args.corpus]
+        new = load(args.source)
+        errors, warnings = validate(new, args.source)
+        for message in errors:
+            logging.error(message)
+        if errors:
+            sys.exit(1)
+        data = load(path)
+        added = merge(data, new)
+        save(path, data)
+        logging.info(f"{args.corpus}: added {added} lines ({len(new)} champions in {args.source}).")
+        ok = build()
+    else:
+        ok = build(args.output)
 
-data.update(new_praises)
+    sys.exit(0 if ok else 1)
 
-with open(filepath, 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=4, ensure_ascii=False)
 
-print(f"Updated {len(new_praises)} champions.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import deque
+
+class DeadlineExceeded(Exception):
+    """A request could not be made (or finished) before the caller's deadline (time.monotonic())."""
+
+
+def time_left(deadline):
+    """Seconds until `deadline` (None: no deadline). Raises DeadlineExceeded once it has passed."""
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline reached")
+    return remaining
+
+
+class _Bucket:
+    """Sliding window for one 'count:seconds' rule of a Riot rate limit header."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.stamps = deque()
+
+    def _trim(self, now):
+        while self.stamps and self.stamps[0] <= now - self.window:
+            self.stamps.popleft()
+
+    def wait_time(self, now):
+        self._trim(now)
+        if len(self.stamps) < self.limit:
+            return 0
+        return self.stamps[0] + self.window - now
+
+    def sync(self, server_count, now):
+        # Riot counts requests we did not see (other processes sharing the key, Actions runs...)
+        self._trim(now)
+        while len(self.stamps) < min(server_count, self.limit):
+            self.stamps.append(now)
+
+
+class _Scope:
+    """All buckets of one scope (app limit for a region, or a method limit for a region)."""
+
+    def __init__(self, rules=None):
+        self.buckets = {}
+        self.blocked_until = 0
+        if rules:
+            self.set_rules(rules)
+
+    def set_rules(self, rules):
+        # Keep existing history when the header repeats the same rules
+        buckets = {}
+        for limit, window in rules:
+            bucket = self.buckets.get(window)
+            if bucket is None:
+                bucket = _Bucket(limit, window)
+            bucket.limit = limit
+            buckets[window] = bucket
+        self.buckets = buckets
+
+    def wait_time(self, now):
+        wait = max(0, self.blocked_until - now)
+        for bucket in self.buckets.values():
+            wait = max(wait, bucket.wait_time(now))
+        return wait
+
+    def record(self, now):
+        for bucket in self.buckets.values():
+            bucket.stamps.append(now)
+
+
+def parse_rate_limit_header(value):
+    """'20:1,100:120' -> [(20, 1), (100, 120)]"""
+    rules = []
+    if not value:
+        return rules
+    for part in value.split(","):
+        try:
+            count, window = part.strip().split(":")
+            rules.append((int(count), int(window)))
+        except ValueError:
+            continue
+    return rules
+
+
+class RateLimiter:
+    """Central scheduler for every Riot request.
+
+    Keeps token buckets per region (X-App-Rate-Limit) and per region+method (X-Method-Rate-Limit).
+    Callers wait for a free slot instead of firing and getting a 429, and a 429 blocks the
+    offending scope for Retry-After seconds.
+    """
+
+    # Development key defaults, replaced by the real values as soon as Riot sends headers
+    DEFAULT_APP_LIMITS = [(20, 1), (100, 120)]
+    DEFAULT_RETRY_AFTER = 5
+
+    def __init__(self, app_limits=None):
+        self.app_limits = app_limits or self.DEFAULT_APP_LIMITS
+        self._app_scopes = {}    # Key: region/host
+        self._method_scopes = {} # Key: (region/host, method)
+        self._lock = threading.Lock()
+
+    def _scopes(self, host, method):
+        app = self._app_scopes.get(host)
+        if app is None:
+            app = self._app_scopes[host] = _Scope(self.app_limits)
+        key = (host, method)
+        meth = self._method_scopes.get(key)
+        if meth is None:
+            meth = self._method_scopes[key] = _Scope()
+        return app, meth
+
+    def reserve(self, host, method):
+        """Takes a slot if one is free and returns 0, otherwise returns how long to wait (seconds)."""
+        with self._lock:
+            now = time.monotonic()
+            app, meth = self._scopes(host, method)
+            wait = max(app.wait_time(now), meth.wait_time(now))
+            if wait > 0:
+                return wait
+            app.record(now)
+            meth.record(now)
+            return 0
+
+    def acquire(self, host, method, deadline=None):
+        """Blocks until a request to host/method is allowed.
+
+        Raises DeadlineExceeded instead of waiting past `deadline` (time.monotonic()).
+        """
+        while True:
+            time_left(deadline) # Don't take a slot for a request that can't be made anymore
+            wait = self.reserve(host, method)
+            if wait <= 0:
+                return
+            remaining = time_left(deadline)
+            if remaining is not None and wait > remaining:
+                raise DeadlineExceeded(f"Rate limit wait on {host}/{method} ({wait:.1f}s) goes past the deadline")
+            logging.debug(f"Rate limit: waiting {wait:.2f}s for {host}/{method}")
+            time.sleep(wait)
+
+    def update(self, host, method, status_code, headers):
+        """Learns limits/counts from a response and handles 429 back off. Returns the Retry-After delay (or 0)."""
+        with self._lock:
+            now = time.monotonic()
+            app, meth = self._scopes(host, method)
+
+            for scope, limit_header, count_header in (
+                (app, "X-App-Rate-Limit", "X-App-Rate-Limit-Count"),
+                (meth, "X-Method-Rate-Limit", "X-Method-Rate-Limit-Count"),
+            ):
+                rules = parse_rate_limit_header(headers.get(limit_header))
+                if rules:
+                    scope.set_rules(rules)
+                for count, window in parse_rate_limit_header(headers.get(count_header)):
+                    bucket = scope.buckets.get(window)
+                    if bucket:
+                        bucket.sync(count, now)
+
+            if status_code != 429:
+                return 0
+
+            try:
+                retry_after = float(headers.get("Retry-After", self.DEFAULT_RETRY_AFTER))
+            except ValueError:
+                retry_after = self.DEFAULT_RETRY_AFTER
+
+            # 'application' blocks the whole region, 'method' / 'service' (no header) only this method
+            limit_type = headers.get("X-Rate-Limit-Type", "service")
+            scope = app if limit_type == "application" else meth
+            scope.blocked_until = max(scope.blocked_until, now + retry_after)
+            logging.warning(f"Rate limited ({limit_type}) on {host}/{method}, backing off {retry_after:.0f}s")
+            return retry_after
@@ -0,0 +1,615 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+
+import assets
+
+# Every renderer here takes plain data (player dicts, ids, tiers) and returns encoded bytes,
+# so the same jobs can run on a thread pool or in worker processes (see RenderBackend).
+
+# Card theme colors: gold / silver / bronze for the podium, cyber blue for everyone else
+CARD_SIZE = (1700, 320)
+THEME_COLORS = [(255, 215, 0), (192, 192, 192), (205, 127, 50)] # Silver slightly darker for contrast
+THEME_DEFAULT = (100, 200, 255)
+
+# Snake animation (top 3 cards), rendered directly at output size
+SNAKE_SIZE = (850, 160)   # Output size, the base card is downscaled once
+SNAKE_FRAMES = 24         # Smooth loop
+SNAKE_LEN = 250           # Length of the neon tail (output pixels)
+SNAKE_POINTS = 25         # Segments per tail
+SNAKE_COLORS = [(255, 215, 0), (220, 220, 255), (205, 127, 50)] # Gold / Silver / Bronze
+
+# Single image leaderboard ("leaderboard_mode": "image")
+LEADERBOARD_PAGE_SIZE = 10 # Rows per image
+LEADERBOARD_ROW_GAP = 20   # Pixels between rows (full resolution)
+
+# Per process caches (each worker process warms its own)
+_card_background_cache = {} # Player independent card backgrounds, one per theme
+_snake_overlay_cache = {}   # Neon overlay frames per (color, frame count)
+_gif_palette_cache = {}     # Shared GIF palettes per (theme, neon color, palette size)
+
+
+def _png(im):
+    b = BytesIO()
+    im.save(b, format="PNG")
+    return b.getvalue()
+
+
+# --- Player cards ---
+
+def theme_color(rank_index):
+    return THEME_COLORS[rank_index] if rank_index < len(THEME_COLORS) else THEME_DEFAULT
+
+
+def card_background(rank_index):
+    """Static part of a card: base, grid, decor, borders, brackets, rank panel, holo floor.
+
+    Only depends on the theme (gold / silver / bronze / default), so it is rendered once per
+    theme and copied for every card.
+    """
+    from PIL import Image, ImageDraw
+
+    theme = min(rank_index, len(THEME_COLORS)) # 0, 1, 2 = podium, 3 = everyone else
+    background = _card_background_cache.get(theme)
+    if background:
+        return background
+
+    WIDTH, HEIGHT = CARD_SIZE
+    CUT = 40
+    BG_DARK = (5, 7, 12)
+    TEXT_GRAY = (200, 200, 200)
+    color = theme_color(rank_index)
+
+    im = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(im, 'RGBA')
+
+    # --- A. BACKGROUND ---
+    # Dark base
+    draw.polygon([(40,0), (WIDTH,0), (WIDTH, HEIGHT-40), (WIDTH-40, HEIGHT), (0, HEIGHT), (0, 40)], fill=BG_DARK)
+
+    # Tech Grid (Static Clean)
+    for x in range(0, WIDTH, 50):
+        draw.line([(x, 0), (x, HEIGHT)], fill=(30, 40, 60, 80), width=1)
+    for y in range(0, HEIGHT, 50):
+        draw.line([(0, y), (WIDTH, y)], fill=(30, 40, 60, 80), width=1)
+
+    # Random Decor (Seeded per theme, locally to avoid affecting global random)
+    rng = random.Random(theme)
+    for _ in range(8):
+        rx = rng.randint(50, WIDTH-50)
+        ry = rng.randint(50, HEIGHT-50)
+        rw = rng.randint(20, 100)
+        draw.rectangle((rx, ry, rx+rw, ry+2), fill=(color[0], color[1], color[2], 150))
+
+    # --- B. SHAPE & BORDERS ---
+    points = [
+        (CUT, 0), (WIDTH, 0), (WIDTH, HEIGHT - CUT),
+        (WIDTH - CUT, HEIGHT), (0, HEIGHT), (0, CUT)
+    ]
+
+    # Glow Border
+    for w in [6, 4, 2]:
+        alpha = 50 + (30 * (6-w))
+        draw.polygon(points, outline=(color[0], color[1], color[2], alpha), width=w)
+
+    # Thick Brackets
+    draw.line([(CUT-5, 0), (CUT+150, 0)], fill=color, width=6)
+    draw.line([(0, CUT-5), (0, CUT+150)], fill=color, width=6)
+    draw.line([(0, CUT), (CUT, 0)], fill=color, width=6)
+
+    draw.line([(WIDTH-CUT+5, HEIGHT), (WIDTH-CUT-150, HEIGHT)], fill=color, width=6)
+    draw.line([(WIDTH, HEIGHT-CUT+5), (WIDTH, HEIGHT-CUT-150)], fill=color, width=6)
+    draw.line([(WIDTH, HEIGHT-CUT), (WIDTH-CUT, HEIGHT)], fill=color, width=6)
+
+    # --- C. RANK SECTION (LEFT) ---
+    # FIX: Dark background for Rank Number, with Colored Outline
+    poly_bg = [(CUT, 0), (220, 0), (260, HEIGHT), (0, HEIGHT), (0, CUT)]
+    draw.polygon(poly_bg, fill=(10, 12, 20, 200)) # Semi-transparent Dark
+    draw.line([(220, 0), (260, HEIGHT)], fill=color, width=2) # Divider Line
+    draw.text((130, HEIGHT-40), "RANKING", font=assets.get_store().get_font(15), fill=TEXT_GRAY, anchor="mm")
+
+    # --- D. Holographic Floor (under the rank emblem) ---
+    icon_x = 340
+    holo_rect = [icon_x, HEIGHT-60, icon_x+180, HEIGHT-40]
+    draw.ellipse(holo_rect, fill=(color[0], color[1], color[2], 50))
+    draw.ellipse(holo_rect, outline=color, width=2)
+
+    _card_background_cache[theme] = im
+    return im
+
+
+def render_base_card(player_data, rank_index):
+    """Full resolution card (PIL image) for one leaderboard row."""
+    from PIL import ImageDraw
+
+    store = assets.get_store()
+
+    # Configuration (ULTIMATE STATIC)
+    WIDTH, HEIGHT = CARD_SIZE
+
+    TEXT_WHITE = (255, 255, 255)
+    TEXT_GRAY = (200, 200, 200)
+
+    NEON_GREEN = (0, 255, 100)
+    NEON_RED = (255, 60, 60)
+
+    # Fonts (cached per size by the asset store)
+    font_rank_big = store.get_font(70)
+    font_name = store.get_font(60)
+    font_details = store.get_font(35)
+    font_wl = store.get_font(28)
+    font_tiny = store.get_font(15)
+
+    # Determine Theme Color
+    color = theme_color(rank_index)
+
+    # Static background is pre-rendered per theme, only the dynamic parts are drawn per player
+    im = card_background(rank_index).copy()
+    draw = ImageDraw.Draw(im, 'RGBA')
+
+    draw.text((130, HEIGHT//2), f"#{rank_index + 1}", font=font_rank_big, fill=color, anchor="mm")
+
+    # --- D. RANK ICON (hologram floor is in the static layer) ---
+    icon_x = 340
+    rank_info = player_data.get('last_rank')
+
+    if rank_info and rank_info['tier'] in assets.RANK_EMBLEMS:
+        icon = store.get_image(assets.RANK_EMBLEMS[rank_info['tier']], size=(210, 210), crop=True)
+        if icon:
+            final_x = (icon_x + 90) - (210 // 2)
+            final_y = (HEIGHT - 210) // 2 - 15
+            im.paste(icon, (final_x, final_y), icon)
+
+    # --- E. INFO & STATS ---
+    name_x = icon_x + 240
+
+    draw.text((name_x, 60), f"// SUMMONER_ID: {player_data['riot_id']}", font=font_tiny, fill=color, anchor="lm")
+    draw.text((name_x, 110), player_data['riot_id'], font=font_name, fill=TEXT_WHITE, anchor="lm")
+
+    if rank_info:
+        detail_text = f"{rank_info['tier']} {rank_info['rank']} // {rank_info['leaguePoints']} LP"
+    else:
+        detail_text = "UNRANKED"
+
+    # FIX: Darker Glass Panel for readability
+    txt_bbox = draw.textbbox((name_x, 180), detail_text, font=font_details)
+    pill_rect = (name_x - 10, 160, txt_bbox[2] + 20, 200)
+    draw.rounded_rectangle(pill_rect, radius=8, fill=(0, 0, 0, 180), outline=color, width=1)
+    draw.text((name_x, 180), detail_text, font=font_details, fill=color, anchor="lm")
+
+    # --- F. WINRATE HUD ---
+    stats_x = WIDTH - 80
+    if rank_info:
+        wins = rank_info.get('wins', 0)
+        losses = rank_info.get('losses', 0)
+        total = wins + losses
+        wr = (wins / total * 100) if total > 0 else 0
+
+        draw.text((stats_x, 100), f"{wr:.1f}%", font=font_name, fill=TEXT_WHITE, anchor="rm")
+        draw.text((stats_x, 60), "WINRATE_CALC", font=font_tiny, fill=TEXT_GRAY, anchor="rm")
+        draw.text((stats_x, 150), f"{wins}W / {losses}L", font=font_wl, fill=TEXT_GRAY, anchor="rm")
+
+        # Segmented Bar
+        bar_w = 350
+        bar_h = 12
+        bar_x = stats_x - bar_w
+        bar_y = 210
+
+        draw.text((bar_x, bar_y - 20), "PERFORMANCE_METRICS", font=font_tiny, fill=color, anchor="lm")
+
+        # Background Bar
+        draw.rectangle((bar_x, bar_y, bar_x+bar_w, bar_y+bar_h), fill=(30, 30, 40), outline=None)
+
+        # Filled Segments
+        color_bar = NEON_GREEN if wr >= 50 else NEON_RED
+        fill_w = int(bar_w * (wr / 100))
+
+        seg_w = 10
+        gap = 4
+        for i in range(bar_w // (seg_w + gap)):
+            x = bar_x + i * (seg_w + gap)
+            rect = [x, bar_y, x+seg_w, bar_y+bar_h]
+            if x < bar_x + fill_w:
+                draw.rectangle(rect, fill=color_bar)
+
+    return im
+
+
+def render_static_card(player_data, rank_index):
+    """PNG bytes of a regular leaderboard card."""
+    return _png(render_base_card(player_data, rank_index))
+
+
+def snake_path_points(frames):
+    """(frames, SNAKE_POINTS + 1, 2) array of tail points along the chamfered border, head first."""
+    import numpy as np
+
+    WIDTH, HEIGHT = SNAKE_SIZE
+    CUT = 20
+    # Coordinates of the polygon corners (chamfer top-left / bottom-right), looping back to start
+    nodes = np.array([
+        (0, CUT), (CUT, 0), (WIDTH, 0), (WIDTH, HEIGHT - CUT),
+        (WIDTH - CUT, HEIGHT), (0, HEIGHT), (0, CUT)
+    ], dtype=float)
+    cum = np.concatenate([[0], np.cumsum(np.hypot(*np.diff(nodes, axis=0).T))])
+    total_length = cum[-1]
+
+    # Head moves forward every frame, tail points trail behind it
+    head = np.arange(frames) / frames * total_length
+    step = SNAKE_LEN / SNAKE_POINTS
+    dist = (head[:, None] - np.arange(SNAKE_POINTS + 1)[None, :] * step) % total_length
+
+    return np.stack([np.interp(dist, cum, nodes[:, 0]), np.interp(dist, cum, nodes[:, 1])], axis=-1)
+
+
+def snake_overlay_frames(color, frames):
+    """Transparent RGBA frames containing only the neon snake, built once per color."""
+    from PIL import Image, ImageDraw
+
+    key = (color, frames)
+    overlays = _snake_overlay_cache.get(key)
+    if overlays:
+        return overlays
+
+    points = snake_path_points(frames).tolist()
+    overlays = []
+    for i in range(frames):
+        overlay = Image.new('RGBA', SNAKE_SIZE, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay, 'RGBA')
+        for j in range(SNAKE_POINTS):
+            p1, p2 = tuple(points[i][j]), tuple(points[i][j + 1])
+            # Alpha fades from 255 (head) to 0 (tail), quadratic for a stronger head
+            progress = 1 - (j / SNAKE_POINTS)
+            alpha = int(255 * (progress ** 2))
+            width = 4 if j < 5 else 3
+            # Glow (wide, low alpha) then core (thin, high alpha)
+            draw.line([p1, p2], fill=(color[0], color[1], color[2], alpha // 4), width=width + 4)
+            draw.line([p1, p2], fill=(color[0], color[1], color[2], alpha), width=width)
+        overlays.append(overlay)
+
+    _snake_overlay_cache[key] = overlays
+    return overlays
+
+
+# Animated card encoders: format -> file extension
+ANIMATION_FORMATS = {"gif": "gif", "webp": "webp", "apng": "png"}
+ANIMATION_LOOP_MS = SNAKE_FRAMES * 60 # One lap of the snake, whatever the frame count
+ANIMATION_MIN_FRAMES = 6
+# Quality steps tried in order when over the byte budget (gif: palette size, webp: quality)
+ANIMATION_QUALITY_STEPS = {"gif": [255, 128, 64], "webp": [80, 60, 40], "apng": [None]}
+
+
+def animation_extension(fmt):
+    return ANIMATION_FORMATS.get(fmt, "gif")
+
+
+def snake_palette(rank_index, colors):
+    """GIF palette shared by every podium card of a theme, built once per palette size.
+
+    Quantized from what those cards can contain: two sample cards (text, pill, green and red
+    winrate bars) with every snake frame composited on, plus all the rank emblems.
+    """
+    from PIL import Image
+
+    theme = min(rank_index, len(THEME_COLORS))
+    color = SNAKE_COLORS[min(rank_index, len(SNAKE_COLORS) - 1)]
+    key = (theme, color, colors)
+    palette = _gif_palette_cache.get(key)
+    if palette:
+        return palette
+
+    samples = []
+    for wins, losses in ((7, 3), (3, 7)):
+        sample = {'riot_id': "SAMPLE#0000", 'last_rank': {'tier': "GOLD", 'rank': "I", 'leaguePoints': 50, 'wins': wins, 'losses': losses}}
+        card = render_base_card(sample, rank_index).resize(SNAKE_SIZE, Image.Resampling.LANCZOS)
+        for overlay in snake_overlay_frames(color, SNAKE_FRAMES):
+            card.alpha_composite(overlay)
+        samples.append(card)
+
+    store = assets.get_store()
+    emblem_size = (105, 105) # Emblem size on a downscaled card
+    emblems = [store.get_image(url, size=emblem_size, crop=True) for url in assets.RANK_EMBLEMS.values()]
+    emblems = [icon for icon in emblems if icon]
+
+    width = max(SNAKE_SIZE[0], emblem_size[0] * len(emblems))
+    sheet = Image.new('RGBA', (width, SNAKE_SIZE[1] * len(samples) + emblem_size[1]), (5, 7, 12, 255))
+    for i, card in enumerate(samples):
+        sheet.alpha_composite(card, (0, i * SNAKE_SIZE[1]))
+    for i, icon in enumerate(emblems):
+        sheet.alpha_composite(icon, (i * emblem_size[0], SNAKE_SIZE[1] * len(samples)))
+
+    # Index 255 stays free for the transparent corners
+    palette = sheet.convert("RGB").quantize(colors=min(colors, 255), method=Image.Quantize.MEDIANCUT)
+    _gif_palette_cache[key] = palette
+    return palette
+
+
+def _encode_gif(frames, colors, duration, palette=None):
+    from PIL import Image
+
+    # One palette for the whole animation (index 255 = transparent corners), shared per theme when given
+    if palette is None:
+        palette = frames[0].convert("RGB").quantize(colors=min(colors, 255), method=Image.Quantize.MEDIANCUT)
+    gif_frames = []
+    for frame in frames:
+        p = frame.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE)
+        p.paste(255, mask=frame.getchannel("A").point(lambda a: 255 if a < 128 else 0))
+        gif_frames.append(p)
+
+    b = BytesIO()
+    gif_frames[0].save(b, format="GIF", save_all=True, append_images=gif_frames[1:], duration=duration, loop=0, transparency=255)
+    return b.getvalue()
+
+
+def _encode_webp(frames, quality, duration, palette=None):
+    b = BytesIO()
+    frames[0].save(b, format="WEBP", save_all=True, append_images=frames[1:], duration=duration, loop=0, quality=quality, method=4)
+    return b.getvalue()
+
+
+def _encode_apng(frames, quality, duration, palette=None):
+    b = BytesIO()
+    frames[0].save(b, format="PNG", save_all=True, append_images=frames[1:], duration=duration, loop=0)
+    return b.getvalue()
+
+
+_ENCODERS = {"gif": _encode_gif, "webp": _encode_webp, "apng": _encode_apng}
+
+
+def encode_animation(frames, fmt="gif", quality=None, duration=60, palette=None):
+    """Encodes RGBA frames as an animated gif / webp / apng. quality=None: best step of the format.
+
+    palette: prebuilt P image for gif (see snake_palette), computed from the first frame otherwise.
+    """
+    if fmt not in _ENCODERS:
+        raise ValueError(f"Unknown animation format: {fmt}")
+    if quality is None:
+        quality = ANIMATION_QUALITY_STEPS[fmt][0]
+    return _ENCODERS[fmt](frames, quality, duration, palette)
+
+
+def snake_frames(base_im, rank_index, frames=SNAKE_FRAMES):
+    """RGBA frames of a podium card (already at SNAKE_SIZE) with the neon snake running around it."""
+    # Composite the cached neon frames for this podium color
+    color = SNAKE_COLORS[min(rank_index, len(SNAKE_COLORS) - 1)]
+    result = []
+    for overlay in snake_overlay_frames(color, frames):
+        frame = base_im.copy()
+        frame.alpha_composite(overlay)
+        result.append(frame)
+    return result
+
+
+def render_snake_card(player_data, rank_index, fmt="gif", frames=SNAKE_FRAMES, max_bytes=None):
+    """Animated podium card bytes (see animation_extension(fmt) for the file type).
+
+    With max_bytes, the quality steps of the format are tried first, then the frame count is
+    halved (same lap duration, choppier snake) until it fits or ANIMATION_MIN_FRAMES is hit.
+    """
+    from PIL import Image
+
+    # Base card, downscaled once to the output size
+    base_im = render_base_card(player_data, rank_index).resize(SNAKE_SIZE, Image.Resampling.LANCZOS)
+    while True:
+        rgba_frames = snake_frames(base_im, rank_index, frames)
+        duration = ANIMATION_LOOP_MS // frames
+        for quality in ANIMATION_QUALITY_STEPS[fmt]:
+            palette = snake_palette(rank_index, quality) if fmt == "gif" else None
+            data = encode_animation(rgba_frames, fmt, quality, duration, palette)
+            if not max_bytes or len(data) <= max_bytes:
+                return data
+        if frames // 2 < ANIMATION_MIN_FRAMES:
+            logging.warning(f"Card #{rank_index + 1} is {len(data)} bytes, over the {max_bytes} bytes budget")
+            return data
+        frames //= 2
+
+
+def render_player_card(player_data, rank_index, animation=None):
+    """Animated snake card for the top 3, static PNG for everyone else.
+
+    animation: {"format": "gif"|"webp"|"apng", "frames": 24, "max_bytes": None} (plain data)
+    """
+    if rank_index < 3:
+        animation = animation or {}
+        return render_snake_card(
+            player_data, rank_index,
+            fmt=animation.get("format", "gif"),
+            frames=animation.get("frames") or SNAKE_FRAMES,
+            max_bytes=animation.get("max_bytes"),
+        )
+    return render_static_card(player_data, rank_index)
+
+
+def render_leaderboard_page(rows, start):
+    """PNG bytes of one leaderboard page: `rows` are the players ranked start, start + 1...
+
+    Rows are the usual cards (cached theme backgrounds + fonts), pasted at full resolution
+    and downscaled once per page to the same width as the individual cards.
+    """
+    from PIL import Image
+
+    WIDTH, HEIGHT = CARD_SIZE
+    row_h = HEIGHT + LEADERBOARD_ROW_GAP
+    out_w = SNAKE_SIZE[0]
+
+    sheet = Image.new('RGBA', (WIDTH, row_h * len(rows) - LEADERBOARD_ROW_GAP), (0, 0, 0, 0))
+    for i, p in enumerate(rows):
+        sheet.paste(render_base_card(p, start + i), (0, i * row_h))
+
+    sheet = sheet.resize((out_w, sheet.height * out_w // WIDTH), Image.Resampling.LANCZOS)
+    return _png(sheet)
+
+
+# --- Alert images ---
+
+def render_item_strip(item_ids):
+    """PNG bytes of a horizontal strip of item icons (6 items + trinket), pasted from the item atlas."""
+    from PIL import Image, ImageDraw
+
+    store = assets.get_store()
+    tiles = store.get_item_tiles()
+
+    # Config
+    ICON_SIZE = assets.ITEM_TILE
+    PADDING = 4
+    TOTAL_ITEMS = 7 # 6 items + 1 trinket
+    WIDTH = (ICON_SIZE * TOTAL_ITEMS) + (PADDING * (TOTAL_ITEMS - 1))
+    HEIGHT = ICON_SIZE
+
+    # Canvas
+    im = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
+
+    for i, item_id in enumerate(item_ids):
+        if item_id == 0: continue # Empty slot
+
+        x_pos = i * (ICON_SIZE + PADDING)
+        tile = tiles.get(item_id)
+        if tile is not None:
+            im.paste(tile, (x_pos, 0)) # Pre-masked, transparent corners included
+            continue
+
+        # Not in the atlas (newer item, mode specific item...): single icon download
+        icon = store.get_image(assets.item_icon_url(item_id, store.resolve_ddragon_version()), size=(ICON_SIZE, ICON_SIZE))
+        if not icon:
+            continue # Just leave empty if failed
+        mask = Image.new("L", (ICON_SIZE, ICON_SIZE), 0)
+        ImageDraw.Draw(mask).rounded_rectangle((0, 0, ICON_SIZE, ICON_SIZE), radius=assets.ITEM_RADIUS, fill=255)
+        im.paste(icon, (x_pos, 0), mask)
+
+    return _png(im)
+
+
+def render_champion_emblem(champion_id, rank_tier):
+    """PNG bytes of the champion icon stacked over the rank emblem, None if the icon is missing."""
+    return _render_champion_emblem(champion_id, rank_tier)[0]
+
+
+# Bump when the thumbnail design changes, old files on disk are then simply ignored
+THUMBNAIL_VERSION = 1
+
+def _thumbnail_path(champion_id, rank_tier):
+    name = f"v{THUMBNAIL_VERSION}_{int(champion_id)}_{rank_tier}.png"
+    return os.path.join(assets.get_store().cache_dir, "thumbnails", name)
+
+
+def champion_emblem_thumbnail(champion_id, rank_tier, disk=True):
+    """render_champion_emblem() behind a disk tier (assets cache dir), keyed by (champion, tier).
+
+    Returns (png bytes or None, complete). Only complete thumbnails are written: a champion-only
+    fallback (emblem download failed) is rendered again next time, callers caching the result
+    in memory should do the same.
+    """
+    path = _thumbnail_path(champion_id, rank_tier)
+    if disk and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                return f.read(), True
+        except OSError as e:
+            logging.warning(f"Could not read thumbnail {path}: {e}")
+
+    data, complete = _render_champion_emblem(champion_id, rank_tier)
+    if disk and data and complete:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + f".{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"Could not cache thumbnail {path}: {e}")
+    return data, complete
+
+
+def _render_champion_emblem(champion_id, rank_tier):
+    """(png bytes or None, complete) - complete is False when the emblem was expected but missing."""
+    from PIL import Image, ImageDraw
+
+    store = assets.get_store()
+
+    # 1. Champion Icon (resized to a fixed good quality size)
+    target_width = 256
+    img_champ = store.get_image(assets.champion_icon_url(champion_id), size=(target_width, target_width))
+    if img_champ is None:
+        return None, False
+
+    # Apply Modern Rounded Corners to Champion
+    # Creating a rounded rectangle mask
+    mask = Image.new("L", (target_width, target_width), 0)
+    draw = ImageDraw.Draw(mask)
+    draw.rounded_rectangle((0, 0, target_width, target_width), radius=40, fill=255)
+
+    # Apply mask
+    img_champ_rounded = Image.new("RGBA", (target_width, target_width))
+    img_champ_rounded.paste(img_champ, (0, 0), mask=mask)
+    img_champ = img_champ_rounded
+
+    # 2. Download Rank Emblem
+    img_rank = None
+    if rank_tier in assets.RANK_EMBLEMS:
+        # CRITICAL: Crop transparent borders to avoid "tiny image" effect
+        img_rank = store.get_image(assets.RANK_EMBLEMS[rank_tier], crop=True)
+
+    if not img_rank:
+        # Just return champion image
+        return _png(img_champ), rank_tier not in assets.RANK_EMBLEMS
+
+    # 3. Resize Rank to match Champion Width (maintain aspect ratio)
+    # We want the rank to be the same width as the champion icon (256px)
+    base_width = target_width
+    w_percent = (base_width / float(img_rank.width))
+    h_size = int((float(img_rank.height) * float(w_percent)))
+    img_rank = img_rank.resize((base_width, h_size), Image.Resampling.LANCZOS)
+
+    # 4. Create Composite Image (Vertical Stack with spacing)
+    spacing = 10
+    total_height = img_champ.height + img_rank.height + spacing
+    combined = Image.new("RGBA", (base_width, total_height))
+
+    combined.paste(img_champ, (0, 0), img_champ)
+    combined.paste(img_rank, (0, img_champ.height + spacing), img_rank)
+
+    # 5. Save to Bytes
+    return _png(combined), True
+
+
+# --- Backends ---
+
+def _init_worker(asset_config):
+    # Worker processes get their own asset store (same dirs, so the disk cache is shared)
+    assets.configure(**asset_config)
+
+
+class RenderBackend:
+    """Runs render jobs off the event loop.
+
+    "thread": default executor threads, cheap but Pillow's Python loops hold the GIL, so
+    cards render one after the other.
+    "process": a pool of worker processes, cards of one refresh render in parallel across
+    cores. Jobs must be module level functions of this file taking plain data.
+    """
+
+    def __init__(self, backend="thread", workers=None, asset_config=None):
+        self.backend = backend
+        if backend == "process":
+            # spawn: never fork a process that has an event loop and client threads running
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(asset_config or {},),
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers) if workers else None
+        logging.info(f"Render backend: {backend}" + (f" ({workers} workers)" if workers else ""))
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,54 +1,141 @@
 import logging
-from riotwatcher import LolWatcher, ApiError
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import startup
+from rate_limiter import DeadlineExceeded, RateLimiter, time_left
 
 class RiotClient:
-    def __init__(self, api_key, region='euw1', routing_value='europe'):
+    # How many times a request is re-queued after a 429 before giving up
+    MAX_RATE_LIMITED_ATTEMPTS = 3
+    RETRY_STATUSES = (500, 502, 503, 504)
+
+    def __init__(self, api_key, region='euw1', routing_value='europe', pool_size=10, timeout=10, retries=3, rate_limiter=None, match_cache=None):
         self.api_key = api_key
-        self.watcher = LolWatcher(api_key)
         self.region = region            # e.g., 'euw1' for Summoner/League V4
         self.routing_value = routing_value # e.g., 'europe' for Match V5 / Account V1
 
-    def get_puuid_by_riot_id(self, game_name, tag_line):
-        """Fetches PUUID using Account V1 via direct requests (riotwatcher issue workaround)"""
-        import requests
+        # HTTP settings shared by every endpoint
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self._sessions = {} # Key: host ('euw1' / 'europe'), Value: keep-alive requests.Session
+        self._sessions_lock = threading.Lock() # check_new_matches polls from a thread pool
+
+        # Shared scheduler for App / Method rate limits (per host + per endpoint)
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # Optional MatchCache: finished matches never change, hits skip the network entirely
+        self.match_cache = match_cache
+
+    def _get_session(self, host):
+        """Returns the pooled keep-alive session for a routing host (created on first use)."""
+        with self._sessions_lock:
+            return self._sessions.get(host) or self._new_session(host)
+
+    def _new_session(self, host):
+        # No urllib3 retries: _get retries itself, so it can stop at the caller's deadline
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.headers.update({"X-Riot-Token": self.api_key})
+        self._sessions[host] = session
+        return session
+
+    def _timeout(self, deadline):
+        remaining = time_left(deadline)
+        return self.timeout if remaining is None else min(self.timeout, remaining)
+
+    def _sleep(self, delay, deadline):
+        remaining = time_left(deadline)
+        if remaining is not None and delay > remaining:
+            raise DeadlineExceeded(f"Waiting {delay:.1f}s goes past the deadline")
+        time.sleep(delay)
+
+    def _get(self, host, method, path, params=None, deadline=None):
+        """GET https://{host}.api.riotgames.com{path} through the host's pooled session.
+
+        `method` is the rate limit bucket name (one per endpoint). The call waits for a free
+        slot, and a 429 is retried after Retry-After instead of being dropped. Server errors
+        and connection drops / timeouts are retried with backoff, 4xx are real answers.
+        With a `deadline` (time.monotonic()) the socket timeout is capped to the time left and
+        DeadlineExceeded is raised rather than waiting or retrying past it.
+        """
+        url = f"https://{host}.api.riotgames.com{path}"
+        rate_limited = 0
+        server_errors = 0
+        while True:
+            self.rate_limiter.acquire(host, method, deadline)
+            startup.mark("first Riot request")
+            try:
+                response = self._get_session(host).get(url, params=params, timeout=self._timeout(deadline))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                time_left(deadline) # Timed out because the deadline was close: report it as such
+                if server_errors >= self.retries:
+                    raise
+                server_errors += 1
+                logging.warning(f"Riot API connection error on {method}, retrying: {err}")
+                self._sleep(0.5 * (2 ** (server_errors - 1)), deadline)
+                continue
+            self.rate_limiter.update(host, method, response.status_code, response.headers)
+
+            # 429: the limiter already blocked the scope for Retry-After, just queue again
+            if response.status_code == 429 and rate_limited < self.MAX_RATE_LIMITED_ATTEMPTS:
+                rate_limited += 1
+                continue
+            if response.status_code in self.RETRY_STATUSES and server_errors < self.retries:
+                server_errors += 1
+                self._sleep(0.5 * (2 ** (server_errors - 1)), deadline)
+                continue
+            return response
+
+    def close(self):
+        """Closes every pooled connection."""
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+    def get_puuid_by_riot_id(self, game_name, tag_line, deadline=None):
+        """Fetches PUUID using Account V1"""
         try:
-            url = f"https://{self.routing_value}.api.riotgames.com/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-            headers = {"X-Riot-Token": self.api_key} # Access key explicitly
-            response = requests.get(url, headers=headers)
+            path = f"/riot/account/v1/accounts/by-riot-id/{quote(game_name)}/{quote(tag_line)}"
+            response = self._get(self.routing_value, "account-v1.by-riot-id", path, deadline=deadline)
             if response.status_code == 200:
                 return response.json()['puuid']
             else:
                 logging.error(f"Riot API Error (get_puuid): {response.status_code} {response.text}")
                 return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
         except Exception as err:
             logging.error(f"Riot API Error (get_puuid): {err}")
             return None
 
-    def get_summoner_by_puuid(self, puuid):
-        """Fetches Summoner V4 data via direct requests"""
-        import requests
+    def get_summoner_by_puuid(self, puuid, deadline=None):
+        """Fetches Summoner V4 data"""
         try:
-            url = f"https://{self.region}.api.riotgames.com/lol/summoner/v4/summoners/by-puuid/{puuid}"
-            headers = {"X-Riot-Token": self.api_key}
-            response = requests.get(url, headers=headers)
+            response = self._get(self.region, "summoner-v4.by-puuid", f"/lol/summoner/v4/summoners/by-puuid/{puuid}", deadline=deadline)
             if response.status_code == 200:
                 return response.json()
             else:
                 logging.error(f"Riot API Error (get_summoner): {response.status_code} {response.text}")
                 return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
         except Exception as err:
             logging.error(f"Riot API Error (get_summoner): {err}")
             return None
 
-    def get_rank_stats(self, puuid):
+    def get_rank_stats(self, puuid, deadline=None):
         """Fetches League V4 data (Rank, LP, Wins/Losses) via PUUID (bypassing broken SummonerID)"""
-        import requests
         try:
             # Undocumented/New endpoint: entries/by-puuid/{puuid}
-            url = f"https://{self.region}.api.riotgames.com/lol/league/v4/entries/by-puuid/{puuid}"
-            headers = {"X-Riot-Token": self.api_key}
-            response = requests.get(url, headers=headers)
-            
+            response = self._get(self.region, "league-v4.entries-by-puuid", f"/lol/league/v4/entries/by-puuid/{puuid}", deadline=deadline)
+
             if response.status_code == 200:
                 leagues = response.json()
                 logging.info(f"Rank Data for {puuid}: {leagues}") # Debug log
@@ -59,28 +146,69 @@ class RiotClient:
                 return None # Unranked or not found
             else:
                 logging.error(f"Riot API Error (get_rank): {response.status_code} {response.text}")
-                return None 
+                return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
         except Exception as err:
             logging.error(f"Riot API Error (get_rank): {err}")
             return None
 
-    def get_last_matches(self, puuid, count=1):
-        """Fetches list of match IDs (Match V5)"""
+    def get_active_game(self, puuid, deadline=None):
+        """Fetches the Spectator V5 game the player is in, None if not in game"""
         try:
-            # filters: type='ranked' to only see ranked games? User said "Ranked Solo/Duo Queue"
-            # but usually type='ranked' includes flex. Queue 420 is Solo/Duo.
-            # We can filter by queue in the query or after fetching. 
-            # safe to fetch generic and filter later or use queue=420.
-            # Let's simple fetch latest.
-            return self.watcher.match.matchlist_by_puuid(self.routing_value, puuid, count=count, queue=420) 
-        except ApiError as err:
+            response = self._get(self.region, "spectator-v5.active-games", f"/lol/spectator/v5/active-games/by-summoner/{puuid}", deadline=deadline)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code != 404: # 404: not in game
+                logging.error(f"Riot API Error (get_active_game): {response.status_code} {response.text}")
+            return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
+            logging.error(f"Riot API Error (get_active_game): {err}")
+            return None
+
+    def get_last_matches(self, puuid, count=1, start=0, start_time=None, deadline=None):
+        """Fetches list of match IDs (Match V5), newest first.
+
+        start / start_time (epoch seconds) allow paging back and fetching only games after a watermark.
+        """
+        params = {"queue": 420, "count": count, "start": start}
+        if start_time:
+            params["startTime"] = int(start_time)
+        try:
+            # Queue 420 is Ranked Solo/Duo (type='ranked' would include flex).
+            # Same pooled session as the other endpoints instead of riotwatcher's own one.
+            response = self._get(self.routing_value, "match-v5.matchlist", f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params, deadline=deadline)
+            if response.status_code == 200:
+                return response.json()
+            else:
+                logging.error(f"Riot API Error (get_matches): {response.status_code} {response.text}")
+                return []
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
             logging.error(f"Riot API Error (get_matches): {err}")
             return []
 
-    def get_match_details(self, match_id):
-        """Fetches Match V5 details"""
+    def get_match_details(self, match_id, deadline=None):
+        """Fetches Match V5 details (from the match cache when possible)"""
+        if self.match_cache:
+            cached = self.match_cache.get(match_id)
+            if cached:
+                return cached
         try:
-            return self.watcher.match.by_id(self.routing_value, match_id)
-        except ApiError as err:
+            response = self._get(self.routing_value, "match-v5.match", f"/lol/match/v5/matches/{match_id}", deadline=deadline)
+            if response.status_code == 200:
+                match = response.json()
+                if self.match_cache:
+                    self.match_cache.put(match_id, match)
+                return match
+            else:
+                logging.error(f"Riot API Error (get_match_details): {response.status_code} {response.text}")
+                return None
+        except DeadlineExceeded:
+            raise # The caller stops its cycle, not an API error
+        except Exception as err:
             logging.error(f"Riot API Error (get_match_details): {err}")
             return None
@@ -0,0 +1,49 @@
+import logging
+import time
+from contextlib import contextmanager
+
+# Startup profiling (main.py --profile-startup): how long each import / init phase takes and
+# when the first Riot request goes out, relative to the start of main.py.
+
+_T0 = time.perf_counter()
+_enabled = False
+_phases = [] # (name, start, duration)
+_marks = {}  # name -> time, first occurrence only
+_reported = False
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+@contextmanager
+def phase(name):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, start - _T0, time.perf_counter() - start))
+
+
+def mark(name):
+    """Records the first time `name` happens (cheap no-op when profiling is off)."""
+    if _enabled and name not in _marks:
+        _marks[name] = time.perf_counter() - _T0
+
+
+def report():
+    """Logs the phases and marks, once."""
+    global _reported
+    if not _enabled or _reported:
+        return
+    _reported = True
+    lines = ["Startup profile (ms since main.py start):"]
+    for name, start, duration in _phases:
+        lines.append(f"  {start * 1000:8.1f}  +{duration * 1000:7.1f}  {name}")
+    for name, at in sorted(_marks.items(), key=lambda item: item[1]):
+        lines.append(f"  {at * 1000:8.1f}            {name}")
+    logging.info("\n".join(lines))
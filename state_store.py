@@ -0,0 +1,171 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+META_KEY = "__meta__" # Reserved snapshot/journal key for bot bookkeeping (leaderboard message IDs...)
+
+class StateCorruptError(Exception):
+    """The state snapshot can't be read. Raised instead of starting over with no players."""
+
+
+def _dumps(data):
+    return json.dumps(data, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+
+
+class JsonStateStore:
+    """Tracker state as a JSON snapshot + an append-only journal of player updates.
+
+    - put() appends one line ({puuid: data}) to `<path>.journal`, so a save only costs the
+      players that changed.
+    - The snapshot is rewritten (temp file + atomic rename) when the journal gets long or on
+      compact(). A crash mid-write can never truncate it.
+    - The snapshot has one player per line: git diffs of the Actions auto-commit stay small.
+    - Non player data (put_meta) lives under the reserved "__meta__" key.
+    """
+
+    COMPACT_AFTER = 200 # Journal lines
+
+    def __init__(self, path="tracker_state.json"):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self._journal_lines = 0
+        self._lock = threading.Lock()
+        self.meta = {}
+
+    def load(self):
+        players = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    players = json.load(f)
+                if not isinstance(players, dict):
+                    raise ValueError("top level is not an object")
+            except Exception as e:
+                # Stop here: continuing with no players would re-baseline everyone and the next
+                # save (or the Actions auto-commit) would overwrite the good history
+                raise StateCorruptError(f"Failed to load {self.path} ({e}), fix or restore it (e.g. from git) and restart") from e
+        meta = players.pop(META_KEY, {})
+
+        torn = False
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        torn = True # Torn last line from a crash, everything before it is valid
+                        break
+                    meta.update(entry.pop(META_KEY, {}))
+                    players.update(entry)
+                    self._journal_lines += 1
+        self.meta = meta
+        if torn:
+            # Start a clean journal, otherwise the next append would be glued to the torn line
+            self.compact(players)
+        return players
+
+    def put(self, puuid, data):
+        with self._lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(_dumps({puuid: data}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_lines += 1
+
+    def load_meta(self):
+        """Bookkeeping dict restored by the last load()."""
+        return dict(self.meta)
+
+    def put_meta(self, key, value):
+        self.meta[key] = value
+        self.put(META_KEY, {key: value})
+
+    def compact(self, players):
+        """Writes a fresh snapshot atomically and empties the journal."""
+        with self._lock:
+            tmp = self.path + ".tmp"
+            lines = [f"{json.dumps(puuid)}:{_dumps(data)}" for puuid, data in sorted(players.items())]
+            if self.meta:
+                lines.append(f"{json.dumps(META_KEY)}:{_dumps(self.meta)}")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write("{\n" + ",\n".join(lines) + "\n}\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._journal_lines = 0
+
+    def needs_compaction(self):
+        return self._journal_lines >= self.COMPACT_AFTER
+
+    def close(self, players):
+        self.compact(players)
+
+
+class SqliteStateStore:
+    """Tracker state in SQLite (WAL mode), one row per player."""
+
+    def __init__(self, path="tracker_state.sqlite3", migrate_from="tracker_state.json"):
+        self.path = path
+        self.migrate_from = migrate_from
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS players (puuid TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self._db.commit()
+
+    def load(self):
+        with self._lock:
+            rows = self._db.execute("SELECT puuid, data FROM players").fetchall()
+        if not rows and self.migrate_from:
+            # First run on SQLite: import the JSON state so nobody gets re-baselined
+            source = JsonStateStore(self.migrate_from)
+            players = source.load()
+            for puuid, data in players.items():
+                self.put(puuid, data)
+            for key, value in source.meta.items():
+                self.put_meta(key, value)
+            if players:
+                logging.info(f"Imported {len(players)} players from {self.migrate_from}")
+            return players
+        return {puuid: json.loads(data) for puuid, data in rows}
+
+    def put(self, puuid, data):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO players (puuid, data) VALUES (?, ?)", (puuid, _dumps(data)))
+            self._db.commit()
+
+    def load_meta(self):
+        with self._lock:
+            rows = self._db.execute("SELECT key, data FROM meta").fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def put_meta(self, key, value):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, data) VALUES (?, ?)", (key, _dumps(value)))
+            self._db.commit()
+
+    def compact(self, players):
+        # Fold the WAL back into the main file (single file to commit / copy)
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def needs_compaction(self):
+        return False
+
+    def close(self, players):
+        self.compact(players)
+        with self._lock:
+            self._db.close()
+
+
+def create_state_store(backend="json", path=None):
+    """'json' (snapshot + journal, default) or 'sqlite'."""
+    if backend == "sqlite":
+        return SqliteStateStore(path or "tracker_state.sqlite3")
+    return JsonStateStore(path or "tracker_state.json")
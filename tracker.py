@@ -1,51 +1,151 @@
+import asyncio
 import logging
-import json
-import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from rate_limiter import DeadlineExceeded
+from state_store import JsonStateStore, StateCorruptError
+
+class SingleFlight:
+    """Coalesces calls with the same key: the first caller fetches, the others reuse its result.
+
+    One instance lives for one polling cycle, so a match shared by several tracked players
+    (duo queue...) is fetched exactly once per cycle.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {} # Key -> concurrent Future (sync) or asyncio Task (async)
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            future = self._calls.get(key)
+            owner = future is None
+            if owner:
+                future = self._calls[key] = Future()
+        if owner:
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    async def do_async(self, key, coro_fn, *args):
+        # Single threaded on the event loop, no lock needed
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(coro_fn(*args))
+        return await task
+
 
 class PlayerTracker:
     STATE_FILE = "tracker_state.json"
 
-    def __init__(self, riot_client, config_players):
+    # Riot ID -> PUUID resolutions older than this are re-checked in the background
+    PUUID_TTL = 7 * 24 * 3600
+
+    # Catch-up: max missed games processed per player per cycle, and matchlist page size when paging back
+    MAX_CATCH_UP = 10
+    CATCH_UP_PAGE = 5
+
+    # Max wait in close() for the background PUUID revalidation (one Account-V1 call per stale player)
+    REVALIDATION_JOIN_TIMEOUT = 30
+
+    def __init__(self, riot_client, config_players, async_client=None, max_concurrency=5, puuid_ttl=None, state_store=None, scheduler=None):
         self.riot_client = riot_client
+        self.async_client = async_client # Optional AsyncRiotClient for check_new_matches_async
+        self.max_concurrency = max_concurrency
+        self.puuid_ttl = self.PUUID_TTL if puuid_ttl is None else puuid_ttl
         self.config_players = config_players # List of {'riot_id': 'Name#Tag'}
         self.players = {} # Key: PUUID, Value: {data}
+        self.meta = {}    # Bot bookkeeping persisted next to the players (e.g. leaderboard message IDs)
+        self._match_flight = SingleFlight() # Replaced every cycle
+        self._deadline = None # Cycle deadline (time.monotonic()) passed to every Riot request, replaced every cycle
+        self.store = state_store or JsonStateStore(self.STATE_FILE)
+        self._dirty = set() # PUUIDs changed since the last save_state()
+        self._dirty_lock = threading.Lock() # The PUUID revalidation thread marks players dirty too
+        self._revalidation = None # Background PUUID revalidation thread, joined by close()
+        self.scheduler = scheduler # Optional PollScheduler: only due players are polled each cycle
         self.load_state()
 
     def load_state(self):
-        if os.path.exists(self.STATE_FILE):
-            try:
-                with open(self.STATE_FILE, 'r') as f:
-                    self.players = json.load(f)
-                logging.info(f"Loaded state for {len(self.players)} players.")
-            except Exception as e:
-                logging.error(f"Failed to load state: {e}")
-                self.players = {}
+        try:
+            self.players = self.store.load()
+            self.meta = self.store.load_meta()
+            logging.info(f"Loaded state for {len(self.players)} players.")
+        except StateCorruptError:
+            raise
+        except Exception as e:
+            logging.error(f"Failed to load state: {e}")
+            self.players = {}
+
+    def mark_dirty(self, puuid):
+        """Flags a player entry as changed, it will be persisted by the next save_state()."""
+        with self._dirty_lock:
+            self._dirty.add(puuid)
+
+    def set_meta(self, key, value):
+        """Stores a bookkeeping value, written right away (not tied to save_state)."""
+        self.meta[key] = value
+        try:
+            self.store.put_meta(key, value)
+            if self.store.needs_compaction():
+                self.store.compact(self.players)
+        except Exception as e:
+            logging.error(f"Failed to save {key}: {e}")
 
     def save_state(self):
+        """Persists only the players changed since the last save (one small write each)."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
         try:
-            with open(self.STATE_FILE, 'w') as f:
-                json.dump(self.players, f, indent=4)
+            for puuid in dirty:
+                if puuid in self.players:
+                    self.store.put(puuid, self.players[puuid])
+            if self.store.needs_compaction():
+                self.store.compact(self.players)
         except Exception as e:
             logging.error(f"Failed to save state: {e}")
+            with self._dirty_lock:
+                self._dirty |= dirty # Retry on the next save
+
+    def close(self):
+        """Flushes pending changes and compacts the store (end of one-shot run / shutdown)."""
+        if self._revalidation is not None:
+            # Its results are only kept if they are flushed below
+            self._revalidation.join(timeout=self.REVALIDATION_JOIN_TIMEOUT)
+            if self._revalidation.is_alive():
+                logging.warning("PUUID revalidation still running at shutdown, unfinished checks are retried on the next startup.")
+        self.save_state()
+        try:
+            self.store.close(self.players)
+        except Exception as e:
+            logging.error(f"Failed to close state store: {e}")
 
     def initialize_players(self):
         """Resolves PUUIDs and ensures every config player is tracked."""
         logging.info("Initializing players...")
         startup_summary = []
         
+        # Riot ID -> PUUID index from the saved state, so known players need no Account-V1 call
+        known = {data['riot_id'].lower(): puuid for puuid, data in self.players.items() if data.get('riot_id')}
+        to_revalidate = []
+
         # 1. Sync Config with State
         # We want to track everyone in config.
         for p_conf in self.config_players:
             riot_id = p_conf['riot_id']
             name, tag = riot_id.split("#") if "#" in riot_id else (riot_id, "EUW")
             
-            # Check if we already have this player in state (by looping state to match riot_id? No, inefficient)
-            # Better: Resolve PUUID first.
-            # Optimization: Check if we have a player with this Riot ID in state (if ID matches).
-            # But IDs change. PUUID is constant.
-            
-            # Let's resolve PUUID from API (or cache if I implemented that, but strict "resolve at start" is safer)
-            puuid = self.riot_client.get_puuid_by_riot_id(name, tag)
+            resolved_at = None
+            puuid, stale = self._cached_puuid(p_conf, known)
+            if stale:
+                to_revalidate.append((riot_id, name, tag, puuid))
+            if not puuid:
+                # Unknown Riot ID (new player or renamed in config): resolve now
+                puuid = self.riot_client.get_puuid_by_riot_id(name, tag)
+                resolved_at = time.time()
             
             if not puuid:
                 logging.error(f"Could not resolve PUUID for {riot_id}")
@@ -67,9 +167,14 @@ class PlayerTracker:
                     "last_match_id": last_match_id,
                     "last_rank": rank_stats
                 }
-            else:
+                self.mark_dirty(puuid)
+            elif self.players[puuid]['riot_id'] != riot_id:
                 # Update Riot ID display name just in case
                 self.players[puuid]['riot_id'] = riot_id
+                self.mark_dirty(puuid)
+            if resolved_at:
+                self.players[puuid]['puuid_resolved_at'] = resolved_at
+                self.mark_dirty(puuid)
             
             # Add to summary
             data = self.players[puuid]
@@ -79,56 +184,287 @@ class PlayerTracker:
             startup_summary.append(f"**{riot_id}**: {rank_str}")
             
         self.save_state()
+
+        if to_revalidate:
+            self._revalidation = threading.Thread(target=self._revalidate_puuids, args=(to_revalidate,), daemon=True)
+            self._revalidation.start()
+
         return startup_summary
 
-    def check_new_matches(self):
-        """Checks for new matches and returns alerts."""
+    def _cached_puuid(self, p_conf, known):
+        """Returns (puuid, stale) from config / saved state, or (None, False) if it must be resolved."""
+        if p_conf.get('puuid'):
+            return p_conf['puuid'], False # Pinned in config.json, never re-resolved
+
+        puuid = known.get(p_conf['riot_id'].lower())
+        if not puuid:
+            return None, False
+
+        resolved_at = self.players[puuid].get('puuid_resolved_at')
+        if not resolved_at:
+            # Old state (before the cache) or invalidated by a revalidation: resolve again
+            return None, False
+        return puuid, time.time() - resolved_at > self.puuid_ttl
+
+    def _revalidate_puuids(self, entries):
+        """Background re-check of stale Riot ID -> PUUID resolutions.
+
+        Uses the cached value meanwhile. If a Riot ID now points to another account, the
+        cached entry is invalidated so the next startup resolves it again.
+        """
+        for riot_id, name, tag, puuid in entries:
+            fresh = self.riot_client.get_puuid_by_riot_id(name, tag)
+            if not fresh:
+                continue # API issue or renamed account, keep the cache for now
+            data = self.players.get(puuid)
+            if not data:
+                continue
+            if fresh == puuid:
+                data['puuid_resolved_at'] = time.time()
+            else:
+                logging.warning(f"{riot_id} now resolves to another account ({fresh}), will re-resolve on next startup.")
+                data['puuid_resolved_at'] = None
+            self.mark_dirty(puuid)
+
+    def _build_alert(self, data, match_details, current_rank, lp_games=0):
+        """Builds the alert dict for a new match.
+
+        lp_games > 0 means this is the newest processed game: the LP diff vs the stored rank
+        is computed and covers that many games (more than 1 after a catch-up).
+        """
+        lp_diff = None
+        last_rank = data.get('last_rank')
+        if lp_games and current_rank and last_rank:
+            if current_rank['tier'] == last_rank['tier'] and current_rank['rank'] == last_rank['rank']:
+                lp_diff = current_rank['leaguePoints'] - last_rank['leaguePoints']
+
+        return {
+            "player": data, # contains riot_id, puuid
+            "match": match_details,
+            "rank": current_rank,
+            "lp_diff": lp_diff,
+            "lp_games": lp_games
+        }
+
+    def _apply_alert(self, data, match_id, match_details, current_rank=None):
+        # Update State IN MEMORY (saved once at the end of the batch)
+        self.mark_dirty(data['puuid'])
+        data['last_match_id'] = match_id
+        info = match_details.get('info', {})
+        end = info.get('gameEndTimestamp') or (info.get('gameStartTimestamp', 0) + info.get('gameDuration', 0) * 1000)
+        if end:
+            data['last_match_end'] = end # Watermark (ms) for the next matchlist query
+        if current_rank is not None:
+            data['last_rank'] = current_rank
+
+    def _new_ids_from(self, history, data):
+        """Splits a matchlist page (newest first): (IDs newer than last_match_id, last_match_id reached?)"""
+        last = data.get('last_match_id')
+        if last in history:
+            return history[:history.index(last)], True
+        return list(history), False
+
+    def _matchlist_plan(self, data):
+        """First matchlist query for a player: (kwargs, paging?)"""
+        if not data.get('last_match_id'):
+            # Never polled: baseline on the latest game only
+            return {"count": 1}, False
+        if data.get('last_match_end'):
+            # One request returns every game that started after the last processed one ended
+            return {"count": self.MAX_CATCH_UP, "start_time": data['last_match_end'] // 1000}, False
+        # No watermark yet (old state): latest game first, page back only if it is new
+        return {"count": 1}, True
+
+    def _fetch_new_match_ids(self, puuid, data):
+        """New ranked match IDs since last_match_id, oldest first (at most MAX_CATCH_UP)."""
+        kwargs, paging = self._matchlist_plan(data)
+        history = self.riot_client.get_last_matches(puuid, deadline=self._deadline, **kwargs)
+        new_ids, reached = self._new_ids_from(history, data)
+        while paging and history and not reached and len(new_ids) < self.MAX_CATCH_UP:
+            history = self.riot_client.get_last_matches(puuid, count=self.CATCH_UP_PAGE, start=len(new_ids), deadline=self._deadline)
+            page_ids, reached = self._new_ids_from(history, data)
+            new_ids.extend(m for m in page_ids if m not in new_ids)
+        return new_ids[:self.MAX_CATCH_UP][::-1]
+
+    def _check_player(self, puuid, data):
+        """Polls one player. Returns ([(match_id, match_details)] oldest first, rank, complete) or None.
+
+        Does not touch state.
+        """
+        try:
+            new_ids = self._fetch_new_match_ids(puuid, data)
+            if not new_ids:
+                return None
+            logging.info(f"New match(es) for {data['riot_id']}: {new_ids}")
+
+            # Fetch Details (stop at the first failure, the rest is picked up next cycle)
+            matches = []
+            for match_id in new_ids:
+                match_details = self._match_flight.do(match_id, self.riot_client.get_match_details, match_id, self._deadline)
+                if not match_details:
+                    break
+                matches.append((match_id, match_details))
+            if not matches:
+                return None # Should not happen usually
+
+            # Fetch New Rank
+            current_rank = self.riot_client.get_rank_stats(puuid, deadline=self._deadline)
+            return matches, current_rank, len(matches) == len(new_ids)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logging.error(f"Error checking {data['riot_id']}: {e}")
+            return None
+
+    def _live_game(self, game):
+        """Spectator payload if it is a ranked game, else None."""
+        if game and game.get('gameQueueConfigId') == 420: # Ranked Solo/Duo
+            return game
+        return None
+
+    def _poll_player(self, puuid, data):
+        """One player's poll for this cycle. Returns (status, live game, _check_player result, matchlist polled).
+
+        status: 'live' in a ranked game (adaptive polling only, the matchlist is only checked when
+        the scheduler asks for it), 'polled', or 'cut' when the cycle deadline was reached.
+        """
+        try:
+            if self.scheduler and self.scheduler.live_detection:
+                game = self._live_game(self.riot_client.get_active_game(puuid, deadline=self._deadline))
+                if game:
+                    polled = self.scheduler.needs_matchlist(puuid, game)
+                    return 'live', game, self._check_player(puuid, data) if polled else None, polled
+            return 'polled', None, self._check_player(puuid, data), True
+        except DeadlineExceeded:
+            logging.info(f"Cycle deadline reached while checking {data['riot_id']}, retried next cycle.")
+            return 'cut', None, None, False
+
+    def _collect_alerts(self, players, results):
+        """Turns per-player poll results into alerts (chronological per player) and updates state, in roster order."""
         alerts = []
-        
-        for puuid, data in self.players.items():
-            try:
-                # Get latest match
-                history = self.riot_client.get_last_matches(puuid, count=1)
-                if not history:
-                    continue
-                
-                latest_match_id = history[0]
-                
-                if latest_match_id != data['last_match_id']:
-                    logging.info(f"New match for {data['riot_id']}: {latest_match_id}")
-                    
-                    # Fetch Details
-                    match_details = self.riot_client.get_match_details(latest_match_id)
-                    if not match_details:
-                        continue # Should not happen usually
-                        
-                    # Fetch New Rank
-                    current_rank = self.riot_client.get_rank_stats(puuid)
-                    
-                    # Calculate LP Diff
-                    lp_diff = None
-                    last_rank = data.get('last_rank')
-                    if current_rank and last_rank:
-                        if current_rank['tier'] == last_rank['tier'] and current_rank['rank'] == last_rank['rank']:
-                            lp_diff = current_rank['leaguePoints'] - last_rank['leaguePoints']
-                    
-                    # Prepare Alert
-                    alerts.append({
-                        "player": data, # contains riot_id, puuid
-                        "match": match_details,
-                        "rank": current_rank,
-                        "lp_diff": lp_diff
-                    })
-                    
-                    # Update State IN MEMORY (Save happens at end of batch to be safe or per item?)
-                    # If we crash, we might re-alert. Better to update memory now, save later.
-                    data['last_match_id'] = latest_match_id
-                    data['last_rank'] = current_rank
-                    
-            except Exception as e:
-                logging.error(f"Error checking {data['riot_id']}: {e}")
-        
+        for (puuid, data), (status, game, result, polled) in zip(players, results):
+            self._schedule(puuid, status, game, result, polled)
+            if not result:
+                continue
+            matches, current_rank, complete = result
+            for i, (match_id, match_details) in enumerate(matches):
+                newest = i == len(matches) - 1
+                # The rank snapshot is only valid after the newest game. If some games are still
+                # missing, keep the old rank so the next diff covers them too.
+                lp_games = len(matches) if newest and complete else 0
+                alerts.append(self._build_alert(data, match_details, current_rank, lp_games=lp_games))
+            match_id, match_details = matches[-1]
+            self._apply_alert(data, match_id, match_details, current_rank if complete else None)
+
         if alerts:
             self.save_state()
-            
+        if self.scheduler and players:
+            self.scheduler.save(self.players)
+
         return alerts
+
+    def _schedule(self, puuid, status, game, result, polled):
+        # Cut players stay due and go first next cycle
+        if not self.scheduler or status == 'cut':
+            return
+        if status == 'live':
+            self.scheduler.record_live(puuid, game, polled=polled, found=bool(result))
+        else:
+            self.scheduler.record_poll(puuid, bool(result))
+
+    def _due_players(self):
+        """Players to poll this cycle: everyone, or the due ones within the request budget (adaptive polling)."""
+        if not self.scheduler:
+            return list(self.players.items())
+        due = self.scheduler.due(list(self.players))
+        logging.info(f"Polling {len(due)} of {len(self.players)} players.")
+        return [(puuid, self.players[puuid]) for puuid in due]
+
+    def _deadline_report(self):
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            # Players cut mid-check changed nothing, their games are found again next cycle
+            logging.warning("Tracker cycle hit its deadline, unfinished players are checked again next cycle.")
+
+    def check_new_matches(self, deadline=None):
+        """Checks for new matches and returns alerts.
+
+        With max_concurrency > 1 players are polled by a thread pool. Workers only fetch,
+        state is updated afterwards from this thread, so alerts keep the roster order.
+        `deadline` (time.monotonic()) bounds every Riot request: past it the remaining
+        players are skipped and what was already fetched is applied.
+        """
+        players = self._due_players()
+        self._match_flight = SingleFlight()
+        self._deadline = deadline
+
+        if self.max_concurrency > 1 and len(players) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(players))) as pool:
+                results = list(pool.map(lambda item: self._poll_player(*item), players))
+        else:
+            results = [self._poll_player(puuid, data) for puuid, data in players]
+
+        self._deadline_report()
+        return self._collect_alerts(players, results)
+
+    async def _fetch_new_match_ids_async(self, puuid, data):
+        kwargs, paging = self._matchlist_plan(data)
+        history = await self.async_client.get_last_matches(puuid, deadline=self._deadline, **kwargs)
+        new_ids, reached = self._new_ids_from(history, data)
+        while paging and history and not reached and len(new_ids) < self.MAX_CATCH_UP:
+            history = await self.async_client.get_last_matches(puuid, count=self.CATCH_UP_PAGE, start=len(new_ids), deadline=self._deadline)
+            page_ids, reached = self._new_ids_from(history, data)
+            new_ids.extend(m for m in page_ids if m not in new_ids)
+        return new_ids[:self.MAX_CATCH_UP][::-1]
+
+    async def _check_player_async(self, puuid, data):
+        """Async _check_player, match details and rank are fetched all at once."""
+        try:
+            new_ids = await self._fetch_new_match_ids_async(puuid, data)
+            if not new_ids:
+                return None
+            logging.info(f"New match(es) for {data['riot_id']}: {new_ids}")
+
+            *details, current_rank = await asyncio.gather(
+                *(self._match_flight.do_async(match_id, self.async_client.get_match_details, match_id, self._deadline) for match_id in new_ids),
+                self.async_client.get_rank_stats(puuid, deadline=self._deadline),
+            )
+            matches = []
+            for match_id, match_details in zip(new_ids, details):
+                if not match_details:
+                    break
+                matches.append((match_id, match_details))
+            if not matches:
+                return None
+            return matches, current_rank, len(matches) == len(new_ids)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logging.error(f"Error checking {data['riot_id']}: {e}")
+            return None
+
+    async def _poll_player_async(self, puuid, data, semaphore):
+        """Async _poll_player."""
+        async with semaphore:
+            try:
+                if self.scheduler and self.scheduler.live_detection:
+                    game = self._live_game(await self.async_client.get_active_game(puuid, deadline=self._deadline))
+                    if game:
+                        polled = self.scheduler.needs_matchlist(puuid, game)
+                        return 'live', game, await self._check_player_async(puuid, data) if polled else None, polled
+                return 'polled', None, await self._check_player_async(puuid, data), True
+            except DeadlineExceeded:
+                logging.info(f"Cycle deadline reached while checking {data['riot_id']}, retried next cycle.")
+                return 'cut', None, None, False
+
+    async def check_new_matches_async(self, deadline=None):
+        """Same as check_new_matches, but polls players concurrently on the event loop.
+
+        At most `max_concurrency` players are in flight. Alerts keep the roster order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        players = self._due_players()
+        self._match_flight = SingleFlight()
+        self._deadline = deadline
+        results = await asyncio.gather(*(self._poll_player_async(puuid, data, semaphore) for puuid, data in players))
+        self._deadline_report()
+        return self._collect_alerts(players, results)